@@ -0,0 +1,249 @@
+"""
+JWT-аутентификация без запроса пользователя к БД.
+
+JWTAuthentication из simplejwt на каждый запрос читает пользователя
+из БД, хотя правам нужны только его роль и флаги. Здесь токен при
+выдаче получает эти поля в claims вместе с поколением пользователя -
+случайным токеном в общем кеше под ключом ``auth:user:{id}``. Любое
+изменение или удаление пользователя удаляет поколение, и старые
+claims перестают приниматься.
+
+Пользователь запроса - экземпляр MyUser, в котором загружены только
+поля AUTH_FIELDS, остальные отложены и дочитываются из БД при
+обращении. Поля берутся из LRU-кеша процесса, если поколение не
+сменилось, иначе из claims токена того же поколения, и только
+в остальных случаях - одним запросом к БД.
+
+Поколение сбрасывается в кеше процесса, сохранившего пользователя,
+поэтому claims и LRU используются, только если кеш общий для всех
+процессов (Memcached, Redis). С LocMemCache или DummyCache сброс
+не дошёл бы до других процессов, и они продолжали бы пускать
+пользователя с прежней ролью, поэтому пользователь читается из БД на
+каждый запрос. Настройка AUTH_CACHE_SHARED задаёт это явно.
+Сброс идёт по сигналам post_save и post_delete: QuerySet.update()
+пользователей их не отправляет, после него нужен forget_auth_user.
+
+Проверенные токены процесс помнит по их SHA-256: повторный запрос
+с тем же токеном не декодирует его и не проверяет подпись, пока не
+истекли VERIFIED_TOKEN_TTL секунд и срок действия самого токена.
+"""
+import threading
+import time
+from collections import OrderedDict
+from hashlib import sha256
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed, InvalidToken)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.constants import (
+    AUTH_USER_CACHE_SIZE, VERIFIED_TOKEN_CACHE_SIZE, VERIFIED_TOKEN_TTL)
+from users.models import MyUser
+
+GENERATION_KEY = 'auth:user:{}'
+GENERATION_CLAIM = 'gen'
+AUTH_FIELDS = ('id', 'username', 'role', 'is_superuser', 'is_active')
+# Поля пользователя в claims токена, кроме id.
+CLAIM_FIELDS = AUTH_FIELDS[1:]
+# Бэкенды кеша, которые видит только один процесс.
+PROCESS_LOCAL_CACHES = (LocMemCache, DummyCache)
+
+
+def auth_cache_shared():
+    """Виден ли кеш поколений всем процессам (AUTH_CACHE_SHARED)."""
+    shared = getattr(settings, 'AUTH_CACHE_SHARED', None)
+    if shared is None:
+        return not isinstance(
+            caches[DEFAULT_CACHE_ALIAS], PROCESS_LOCAL_CACHES)
+    return shared
+
+
+def get_auth_generation(user_id, create=False):
+    generation = cache.get(GENERATION_KEY.format(user_id))
+    if generation is None and create:
+        generation = uuid4().hex
+        if not cache.add(GENERATION_KEY.format(user_id), generation, None):
+            generation = cache.get(GENERATION_KEY.format(user_id), generation)
+    return generation
+
+
+def forget_auth_user(user_id):
+    """
+    Сбрасывает поля пользователя в claims и кешах всех процессов
+    (других процессов - только при общем кеше).
+    """
+    cache.delete(GENERATION_KEY.format(user_id))
+    user_cache.discard(user_id)
+
+
+def access_token_for_user(user):
+    """Токен доступа с ролью и флагами пользователя в claims."""
+    token = AccessToken.for_user(user)
+    for field in CLAIM_FIELDS:
+        token[field] = getattr(user, field)
+    token[GENERATION_CLAIM] = get_auth_generation(user.pk, create=True)
+    return token
+
+
+def build_user(fields):
+    """Экземпляр MyUser с загруженными полями fields, остальные отложены."""
+    concrete = [
+        field for field in MyUser._meta.concrete_fields
+        if field.attname in fields
+    ]
+    return MyUser.from_db(
+        DEFAULT_DB_ALIAS,
+        [field.attname for field in concrete],
+        [fields[field.attname] for field in concrete],
+    )
+
+
+class AuthUserCache:
+    """LRU полей аутентифицированных пользователей процесса."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, user_id, generation):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] != generation:
+                return None
+            self._entries.move_to_end(user_id)
+            return entry[1]
+
+    def put(self, user_id, generation, fields):
+        with self._lock:
+            self._entries[user_id] = (generation, fields)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class VerifiedTokenCache:
+    """
+    LRU проверенных токенов процесса по SHA-256 их строки. Запись живёт
+    не дольше ttl секунд и не дольше срока действия токена (exp).
+    """
+
+    timer = time.time
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def get_digest(raw_token):
+        if isinstance(raw_token, str):
+            raw_token = raw_token.encode()
+        return sha256(raw_token).digest()
+
+    def get(self, raw_token):
+        digest = self.get_digest(raw_token)
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                return None
+            expires, token = entry
+            if expires <= self.timer():
+                del self._entries[digest]
+                return None
+            self._entries.move_to_end(digest)
+            return token
+
+    def put(self, raw_token, token):
+        expires = min(self.timer() + self.ttl, token.get('exp', 0))
+        if expires <= self.timer():
+            return
+        digest = self.get_digest(raw_token)
+        with self._lock:
+            self._entries[digest] = (expires, token)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = AuthUserCache(
+    getattr(settings, 'AUTH_USER_CACHE_SIZE', AUTH_USER_CACHE_SIZE))
+token_cache = VerifiedTokenCache(
+    getattr(settings, 'VERIFIED_TOKEN_CACHE_SIZE', VERIFIED_TOKEN_CACHE_SIZE),
+    getattr(settings, 'VERIFIED_TOKEN_TTL', VERIFIED_TOKEN_TTL))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication, которой для прав не нужен запрос к БД."""
+
+    def get_validated_token(self, raw_token):
+        token = token_cache.get(raw_token)
+        if token is None:
+            token = super().get_validated_token(raw_token)
+            token_cache.put(raw_token, token)
+        return token
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                'Token contained no recognizable user identification')
+        if auth_cache_shared():
+            fields = self.get_cached_fields(user_id, validated_token)
+        else:
+            fields = self.read_fields(user_id)
+        user = build_user(fields)
+        if not user.is_active:
+            raise AuthenticationFailed(
+                'User is inactive', code='user_inactive')
+        return user
+
+    def get_cached_fields(self, user_id, validated_token):
+        generation = get_auth_generation(user_id)
+        fields = None
+        if generation is not None:
+            fields = user_cache.get(user_id, generation)
+            if fields is None and (
+                    validated_token.get(GENERATION_CLAIM) == generation):
+                fields = {'id': user_id, **{
+                    field: validated_token.get(field)
+                    for field in CLAIM_FIELDS
+                }}
+        if fields is None:
+            # Поколение создаётся до чтения: изменение, закоммиченное
+            # после чтения, удалит его, и устаревшие поля не останутся.
+            generation = get_auth_generation(user_id, create=True)
+            fields = self.read_fields(user_id)
+        user_cache.put(user_id, generation, fields)
+        return fields
+
+    @staticmethod
+    def read_fields(user_id):
+        fields = MyUser.objects.filter(pk=user_id).values(
+            *AUTH_FIELDS).first()
+        if fields is None:
+            raise AuthenticationFailed(
+                'User not found', code='user_not_found')
+        return fields
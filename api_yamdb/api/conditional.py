@@ -0,0 +1,125 @@
+"""
+Условные GET-запросы по маркерам версий.
+
+Маркер - пара (случайный токен, время изменения), хранящаяся в кеше
+под именем вроде ``title:5`` или ``reviews:5``. Записи в БД меняют
+маркеры затронутых ресурсов после коммита транзакции. ETag ответа
+строится из токенов маркеров, Last-Modified - из самого позднего
+времени изменения, поэтому на ``If-None-Match``/``If-Modified-Since``
+можно ответить 304 до основного запроса к БД.
+
+Маркеры меняет процесс, записавший данные, поэтому заголовки
+отдаются, только если кеш общий для всех процессов (см.
+api.authentication.auth_cache_shared). С LocMemCache другие процессы
+не увидели бы новых маркеров и отвечали бы 304 на устаревшие данные.
+"""
+import math
+import time
+from hashlib import md5
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from api.authentication import auth_cache_shared
+
+MARKER_KEY = 'version:{}'
+# Маркер, входящий в каждый ETag: сбрасывает все версии разом,
+# например после migrate или flush.
+GLOBAL_MARKER = 'data'
+
+
+def new_marker(previous=None):
+    # Last-Modified имеет точность в секунду: время округляется вверх
+    # и растёт с каждой записью, чтобы запись в ту же секунду, что
+    # и чтение, не дала клиенту 304 со старыми данными.
+    modified = math.ceil(time.time())
+    if previous is not None:
+        modified = max(modified, previous[1] + 1)
+    return uuid4().hex, modified
+
+
+def bump_version_markers(*names):
+    """Выдаёт новые маркеры версий ресурсам с именами names."""
+    keys = [MARKER_KEY.format(name) for name in names]
+    markers = cache.get_many(keys)
+    cache.set_many(
+        {key: new_marker(markers.get(key)) for key in keys}, None)
+
+
+def get_version_markers(names):
+    """Маркеры версий по именам; недостающие создаются заново."""
+    keys = [MARKER_KEY.format(name) for name in names]
+    markers = cache.get_many(keys)
+    for key in keys:
+        if key not in markers:
+            marker = new_marker()
+            if not cache.add(key, marker, None):
+                marker = cache.get(key, marker)
+            markers[key] = marker
+    return [markers[key] for key in keys]
+
+
+class ResponseReady(Exception):
+    """Готовый ответ, прерывающий обработку запроса в initial()."""
+
+    def __init__(self, response):
+        super().__init__()
+        self.response = response
+
+
+class ConditionalGetMixin:
+    """
+    ETag и Last-Modified для list и retrieve.
+
+    Вьюсет перечисляет в ``get_version_markers`` маркеры, от которых
+    зависит ответ текущего действия. Заголовки условного запроса
+    проверяются после аутентификации и проверки прав, но до обращения
+    к queryset.
+    """
+    conditional_actions = ('list', 'retrieve')
+    validators = None
+
+    def get_version_markers(self):
+        return ()
+
+    def get_validators(self, request):
+        names = self.get_version_markers()
+        if not names or not auth_cache_shared():
+            return None
+        markers = get_version_markers((GLOBAL_MARKER, *names))
+        etag = md5(repr((
+            request.get_full_path(),
+            request.accepted_media_type,
+            [token for token, _ in markers],
+        )).encode()).hexdigest()
+        return quote_etag(etag), max(modified for _, modified in markers)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method not in ('GET', 'HEAD') or (
+                self.action not in self.conditional_actions):
+            return
+        self.validators = self.get_validators(request)
+        if self.validators is None:
+            return
+        etag, last_modified = self.validators
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified)
+        if response is not None:
+            raise ResponseReady(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, ResponseReady):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs)
+        if self.validators is not None and response.status_code == 200:
+            etag, last_modified = self.validators
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+        return response
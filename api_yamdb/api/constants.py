@@ -0,0 +1,12 @@
+TITLES_BULK_MAX_ITEMS = 5000
+REVIEWS_BULK_MAX_ITEMS = 5000
+# Секунды, в течение которых повторная регистрация той же пары имени
+# и почты не высылает новое письмо (настройка SIGNUP_RESEND_WINDOW).
+SIGNUP_RESEND_WINDOW = 60
+# Пользователей в LRU-кеше аутентификации одного процесса
+# (настройка AUTH_USER_CACHE_SIZE).
+AUTH_USER_CACHE_SIZE = 10000
+# Проверенных токенов в кеше процесса и сколько секунд помнить
+# каждый из них (настройки VERIFIED_TOKEN_CACHE_SIZE и VERIFIED_TOKEN_TTL).
+VERIFIED_TOKEN_CACHE_SIZE = 10000
+VERIFIED_TOKEN_TTL = 5 * 60
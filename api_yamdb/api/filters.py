@@ -1,5 +1,9 @@
-from django_filters.rest_framework import CharFilter, FilterSet, NumberFilter
-from reviews.models import Title
+from django_filters.rest_framework import (
+    CharFilter, ChoiceFilter, FilterSet, NumberFilter)
+from reviews.models import Category, Genre, Title
+from reviews.reference import reference
+from reviews.search import search_titles
+from reviews.utils import GENRE_MODE_ALL, GENRE_MODE_ANY, filter_by_genres
 
 
 class TitleFilter(FilterSet):
@@ -8,19 +12,46 @@ class TitleFilter(FilterSet):
         field_name='name',
         lookup_expr='icontains'
     )
-    category = CharFilter(
-        field_name='category__slug',
-        lookup_expr='iexact'
-    )
-    genre = CharFilter(
-        field_name='genre__slug',
-        lookup_expr='iexact'
+    category = CharFilter(method='filter_category')
+    genre = CharFilter(method='filter_genre')
+    genre_mode = ChoiceFilter(
+        choices=((GENRE_MODE_ALL, 'Все жанры'), (GENRE_MODE_ANY, 'Любой')),
+        method='filter_genre_mode'
     )
     year = NumberFilter(
         field_name="year",
         lookup_expr="iexact"
     )
+    search = CharFilter(method='filter_search')
 
     class Meta:
         model = Title
-        fields = ('name', 'year', 'genre', 'category')
+        fields = ('name', 'year', 'genre', 'genre_mode', 'category', 'search')
+
+    def filter_search(self, queryset, name, value):
+        return search_titles(queryset, value)
+
+    def filter_category(self, queryset, name, value):
+        """Фильтр по слагу категории без JOIN с таблицей категорий."""
+        return queryset.filter(category__in=[
+            category.pk
+            for category in reference.filter_by_slug(Category, value)
+        ])
+
+    def filter_genre(self, queryset, name, value):
+        """Фильтр по списку слагов жанров через запятую."""
+        slugs = {slug.strip().lower() for slug in value.split(',')}
+        slugs.discard('')
+        if not slugs:
+            return queryset
+        mode = self.form.cleaned_data.get('genre_mode') or GENRE_MODE_ANY
+        found = [reference.filter_by_slug(Genre, slug) for slug in slugs]
+        if not any(found) or (
+                mode == GENRE_MODE_ALL and not all(found)):
+            return queryset.none()
+        genres = [genre for matches in found for genre in matches]
+        return filter_by_genres(queryset, genres, mode)
+
+    def filter_genre_mode(self, queryset, name, value):
+        # Режим учитывается в filter_genre.
+        return queryset
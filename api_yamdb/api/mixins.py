@@ -1,18 +1,122 @@
+from django.core.exceptions import FieldDoesNotExist
 from rest_framework import filters, status
 from rest_framework.generics import DestroyAPIView, ListCreateAPIView
+from rest_framework.permissions import SAFE_METHODS
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
 from api.permissions import IsAdminOrReadOnly
+from api.response_cache import ResponseCacheMixin
 
 
-class MixinViewSet(ListCreateAPIView,
+def restrict_queryset(queryset, serializer_class, fields, extra=()):
+    """
+    Загружает только столбцы, нужные запрошенным полям сериализатора,
+    и убирает select_related/prefetch_related для незапрошенных связей.
+    """
+    serializer_fields = serializer_class().fields
+    model = queryset.model
+    columns = {model._meta.pk.name, *extra}
+    relations = set()
+    for name in fields:
+        if name not in serializer_fields:
+            continue
+        # Поле может объявить связи, которые оно читает помимо source.
+        relations.update(getattr(serializer_fields[name], 'relations', ()))
+        source = serializer_fields[name].source.split('.')[0]
+        try:
+            model_field = model._meta.get_field(source)
+        except FieldDoesNotExist:
+            continue
+        if model_field.many_to_many or model_field.one_to_many:
+            relations.add(source)
+            continue
+        columns.add(source)
+        if model_field.is_relation:
+            relations.add(source)
+
+    select_related = queryset.query.select_related
+    prefetch = queryset._prefetch_related_lookups
+    queryset = queryset.select_related(None).prefetch_related(None)
+    if isinstance(select_related, dict):
+        names = [name for name in select_related if name in relations]
+        if names:
+            queryset = queryset.select_related(*names)
+    queryset = queryset.prefetch_related(*(
+        lookup for lookup in prefetch
+        if getattr(lookup, 'prefetch_through', lookup).split('__')[0]
+        in relations
+    ))
+    return queryset.only(*columns)
+
+
+class SparseFieldsViewMixin:
+    """
+    Поддержка параметра ``?fields=id,name`` при чтении: сериализатор
+    отдаёт только перечисленные поля, а запрос к БД выбирает только
+    нужные столбцы и связи.
+    """
+    fields_query_param = 'fields'
+
+    def get_requested_fields(self):
+        if self.request.method not in SAFE_METHODS:
+            return None
+        value = self.request.query_params.get(self.fields_query_param, '')
+        return [name.strip() for name in value.split(',') if name.strip()]
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        fields = self.get_requested_fields()
+        if fields:
+            queryset = restrict_queryset(
+                queryset, self.get_serializer_class(), fields,
+                extra=getattr(self, 'keyset_ordering', ()))
+        return queryset
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_requested_fields()
+        if fields:
+            kwargs.setdefault('fields', fields)
+        return super().get_serializer(*args, **kwargs)
+
+
+class ValuesListMixin:
+    """
+    Списки строятся читателем ``values_reader`` сериализатора прямо
+    из строк values(), минуя создание моделей и ModelSerializer.
+    При запросе отдельных полей (``?fields=``) используется обычный путь.
+    """
+
+    def list(self, request, *args, **kwargs):
+        reader = getattr(self.get_serializer_class(), 'values_reader', None)
+        if reader is None or self.get_requested_fields():
+            return super().list(request, *args, **kwargs)
+        queryset = reader.get_queryset(
+            self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return Response(reader.to_representation(queryset))
+        return self.get_paginated_response(reader.to_representation(page))
+
+
+class MixinViewSet(ResponseCacheMixin,
+                   SparseFieldsViewMixin,
+                   ListCreateAPIView,
                    DestroyAPIView,
                    GenericViewSet):
     permission_classes = (IsAdminOrReadOnly,)
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
+    query_budget = {'list': 3, 'create': 3, 'destroy': 5}
+    # Маркер версии списка, сбрасываемый при любой записи в таблицу.
+    version_marker = None
+
+    def get_version_markers(self):
+        return (self.version_marker,) if self.version_marker else ()
+
+    def get_cache_tags(self, data):
+        return self.get_version_markers()
 
     def get(self, request, *args, **kwargs):
         return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
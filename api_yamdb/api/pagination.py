@@ -0,0 +1,278 @@
+import json
+from base64 import b64decode, b64encode
+from binascii import Error as BinasciiError
+from collections import OrderedDict
+from datetime import date, datetime
+from hashlib import md5
+
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, ValidationError
+from django.core.paginator import Paginator
+from django.db.models import BooleanField, F, Func, QuerySet, Value
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+COUNT_CACHE_TIMEOUT = 60 * 5
+GENERATION_KEY = 'count-generation:{}'
+
+
+def bump_count_generation(*tables):
+    """Сбрасывает закешированные количества строк для таблиц."""
+    for table in tables:
+        key = GENERATION_KEY.format(table)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+
+def get_query_tables(queryset):
+    return sorted({
+        join.table_name for join in queryset.query.alias_map.values()
+    } | {queryset.model._meta.db_table})
+
+
+def get_cached_count(queryset):
+    """
+    COUNT(*) выборки с кешированием. Ключ строится по SQL запроса
+    и поколениям всех его таблиц, поэтому любая запись в эти таблицы
+    делает старое значение недоступным.
+    """
+    tables = get_query_tables(queryset)
+    generations = cache.get_many(
+        [GENERATION_KEY.format(table) for table in tables])
+    try:
+        sql, params = queryset.query.sql_with_params()
+    except EmptyResultSet:
+        return 0
+    key = 'count:' + md5(repr(
+        (sql, params, sorted(generations.items()))
+    ).encode()).hexdigest()
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, COUNT_CACHE_TIMEOUT)
+    return count
+
+
+class RowValueComparison(Func):
+    """
+    Сравнение строк ``(f1, f2, ...) > (v1, v2, ...)`` одним условием.
+    В отличие от раскрытия в OR из AND, такое условие SQLite выполняет
+    как поиск по составному индексу.
+    """
+    output_field = BooleanField()
+
+    def __init__(self, fields, values, operator):
+        self.operator = operator
+        super().__init__(*fields, *values)
+
+    def as_sql(self, compiler, connection):
+        parts, params = [], []
+        for expression in self.get_source_expressions():
+            sql, sql_params = compiler.compile(expression)
+            parts.append(sql)
+            params.extend(sql_params)
+        half = len(parts) // 2
+        sql = '({}) {} ({})'.format(
+            ', '.join(parts[:half]), self.operator, ', '.join(parts[half:]))
+        return sql, params
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator, берущий количество объектов из кеша."""
+
+    @cached_property
+    def count(self):
+        if isinstance(self.object_list, QuerySet):
+            return get_cached_count(self.object_list)
+        return super().count
+
+
+class CachedCountPagination(PageNumberPagination):
+    """
+    Постраничная пагинация с кешированным ``count``.
+
+    С параметром ``count=false`` количество не считается вовсе:
+    выбирается на одну запись больше страницы, а ответ содержит
+    только ``next``, ``previous`` и ``results``.
+    """
+    django_paginator_class = CachedCountPaginator
+    count_query_param = 'count'
+
+    def skip_count(self, request):
+        return request.query_params.get(
+            self.count_query_param, '').lower() in ('0', 'false', 'no')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.without_count = self.skip_count(request)
+        if not self.without_count:
+            return super().paginate_queryset(queryset, request, view)
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        self.request = request
+        try:
+            self.page_number = int(
+                request.query_params.get(self.page_query_param, 1))
+            if self.page_number < 1:
+                raise ValueError
+        except ValueError:
+            raise NotFound(self.invalid_page_message.format(
+                page_number=request.query_params.get(self.page_query_param),
+                message='Неверный номер страницы.'))
+        offset = (self.page_number - 1) * page_size
+        results = list(queryset[offset:offset + page_size + 1])
+        self.has_next = len(results) > page_size
+        return results[:page_size]
+
+    def get_next_link(self):
+        if not self.without_count:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.page_query_param, self.page_number + 1)
+
+    def get_previous_link(self):
+        if not self.without_count:
+            return super().get_previous_link()
+        if self.page_number == 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page_number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(
+            url, self.page_query_param, self.page_number - 1)
+
+    def get_paginated_response(self, data):
+        if not self.without_count:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+
+class KeysetPagination(CachedCountPagination):
+    """
+    Постраничная пагинация с keyset-режимом по запросу.
+
+    Вьюкласс объявляет порядок в атрибуте ``keyset_ordering``, например
+    ``('pub_date', 'id')``. Если в запросе есть параметр ``cursor``
+    (для первой страницы - пустой), выборка идёт по условию
+    ``(pub_date, id) > (последняя запись)`` вместо OFFSET и без COUNT(*),
+    а ответ содержит только ``next``, ``previous`` и ``results``.
+    Без ``cursor`` работает CachedCountPagination.
+    """
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Неверный курсор.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.without_count = False
+        self.keyset_ordering = getattr(view, 'keyset_ordering', None)
+        self.use_keyset = bool(self.keyset_ordering) and (
+            self.cursor_query_param in request.query_params)
+        if not self.use_keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        self.request = request
+        self.base_url = remove_query_param(
+            request.build_absolute_uri(), self.page_query_param)
+        self.model = queryset.model
+        position, reverse = self.decode_cursor(request)
+
+        fields = self.keyset_ordering
+        queryset = queryset.order_by(
+            *(f'-{field}' if reverse else field for field in fields))
+        if position is not None:
+            queryset = queryset.filter(
+                self.get_keyset_filter(position, reverse))
+        results = list(queryset[:page_size + 1])
+        has_more = len(results) > page_size
+        results = results[:page_size]
+        if reverse:
+            results.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        self.page_results = results
+        return results
+
+    def get_keyset_filter(self, position, reverse):
+        """Условие ``(f1, f2, ...) > (v1, v2, ...)`` по позиции курсора."""
+        fields = [self.model._meta.get_field(f) for f in self.keyset_ordering]
+        return RowValueComparison(
+            [F(field.name) for field in fields],
+            [
+                Value(value, output_field=field)
+                for field, value in zip(fields, position)
+            ],
+            '<' if reverse else '>',
+        )
+
+    def get_position(self, obj):
+        position = []
+        for field in self.keyset_ordering:
+            value = obj[field] if isinstance(obj, dict) else getattr(
+                obj, field)
+            if isinstance(value, (date, datetime)):
+                value = value.isoformat()
+            position.append(value)
+        return position
+
+    def encode_cursor(self, position, reverse):
+        data = json.dumps({'p': position, 'r': int(reverse)})
+        cursor = b64encode(data.encode()).decode()
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            data = json.loads(b64decode(encoded.encode()).decode())
+            position = [
+                self.model._meta.get_field(field).to_python(value)
+                for field, value in zip(self.keyset_ordering, data['p'])
+            ]
+            if len(position) != len(self.keyset_ordering):
+                raise ValueError
+            return position, bool(data.get('r'))
+        except (TypeError, ValueError, KeyError, BinasciiError,
+                ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.use_keyset:
+            return super().get_next_link()
+        if not self.has_next or not self.page_results:
+            return None
+        return self.encode_cursor(
+            self.get_position(self.page_results[-1]), reverse=False)
+
+    def get_previous_link(self):
+        if not self.use_keyset:
+            return super().get_previous_link()
+        if not self.has_previous or not self.page_results:
+            return None
+        return self.encode_cursor(
+            self.get_position(self.page_results[0]), reverse=True)
+
+    def get_paginated_response(self, data):
+        if not self.use_keyset:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
@@ -0,0 +1,162 @@
+"""
+Учёт SQL-запросов на один запрос к API.
+
+Вьюкласс объявляет бюджет запросов по действиям в атрибуте
+``query_budget``, например ``{'list': 4, 'retrieve': 3}``.
+QueryBudgetMiddleware считает выполненные запросы и время БД,
+добавляет их в заголовки ответа, копит статистику по эндпоинтам
+и пишет предупреждение в лог при превышении бюджета. Путь обработки,
+которому нужно больше запросов, чем основному, вьюкласс относит
+к отдельному действию со своим бюджетом через set_query_action.
+"""
+import logging
+import random
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': True,
+    'SAMPLE_RATE': 1.0,
+    'HEADERS': True,
+}
+
+COUNT_HEADER = 'X-Query-Count'
+TIME_HEADER = 'X-Query-Time'
+BUDGET_HEADER = 'X-Query-Budget'
+ENDPOINT_HEADER = 'X-Query-Endpoint'
+
+
+def get_setting(name):
+    return getattr(settings, 'QUERY_BUDGET', {}).get(name, DEFAULTS[name])
+
+
+class QueryCounter:
+    """Обёртка execute_wrapper, считающая запросы и время их выполнения."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - start
+
+
+@contextmanager
+def count_queries():
+    """Считает запросы ко всем подключениям внутри блока with."""
+    counter = QueryCounter()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(counter))
+        yield counter
+
+
+def get_endpoint(view_func, method):
+    """
+    Возвращает имя эндпоинта вида ``TitleViewSet.list``
+    и объявленный для него бюджет запросов.
+    """
+    view_class = getattr(view_func, 'cls', None)
+    if view_class is None:
+        return None, None
+    method = method.lower()
+    action = (getattr(view_func, 'actions', None) or {}).get(method, method)
+    budget = getattr(view_class, 'query_budget', {}).get(action)
+    return f'{view_class.__name__}.{action}', budget
+
+
+def set_query_action(request, view, action):
+    """
+    Относит текущий запрос к действию action вьюкласса view: запросы
+    учитываются под эндпоинтом ``{View}.{action}`` и сверяются
+    с бюджетом ``query_budget[action]``.
+    """
+    request = getattr(request, '_request', request)
+    if getattr(request, '_query_endpoint', None) is None:
+        return
+    request._query_endpoint = f'{type(view).__name__}.{action}'
+    request._query_budget = getattr(view, 'query_budget', {}).get(action)
+
+
+class QueryReport:
+    """Накопленная статистика запросов по эндпоинтам."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def add(self, endpoint, budget, counter):
+        with self._lock:
+            stats = self._endpoints.setdefault(endpoint, {
+                'requests': 0,
+                'queries': 0,
+                'max_queries': 0,
+                'db_time': 0.0,
+                'over_budget': 0,
+                'budget': budget,
+            })
+            stats['requests'] += 1
+            stats['queries'] += counter.count
+            stats['max_queries'] = max(stats['max_queries'], counter.count)
+            stats['db_time'] += counter.duration
+            if budget is not None and counter.count > budget:
+                stats['over_budget'] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                endpoint: dict(stats)
+                for endpoint, stats in self._endpoints.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+
+report = QueryReport()
+
+
+class QueryBudgetMiddleware:
+    """Middleware, считающий SQL-запросы выборки обрабатываемых запросов."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not get_setting('ENABLED') or (
+                random.random() >= get_setting('SAMPLE_RATE')):
+            return self.get_response(request)
+        with count_queries() as counter:
+            response = self.get_response(request)
+        endpoint = getattr(request, '_query_endpoint', None)
+        if endpoint is None:
+            return response
+        budget = request._query_budget
+        report.add(endpoint, budget, counter)
+        if budget is not None and counter.count > budget:
+            logger.warning(
+                '%s выполнил %d SQL-запросов при бюджете %d',
+                endpoint, counter.count, budget)
+        if get_setting('HEADERS'):
+            response[ENDPOINT_HEADER] = endpoint
+            response[COUNT_HEADER] = str(counter.count)
+            response[TIME_HEADER] = f'{counter.duration * 1000:.2f}'
+            if budget is not None:
+                response[BUDGET_HEADER] = str(budget)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._query_endpoint, request._query_budget = get_endpoint(
+            view_func, request.method)
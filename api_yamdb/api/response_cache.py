@@ -0,0 +1,106 @@
+"""
+Кеш ответов на анонимные GET-запросы.
+
+Ключ записи строится по адресу и нормализованной строке запроса.
+Запись хранит готовое тело ответа вместе с токенами маркеров версий
+(см. ``api.conditional``), от которых оно зависит: например, страница
+произведений зависит от маркеров показанных на ней произведений,
+жанров и категорий. Запись действительна, пока ни один из этих маркеров
+не сменился, поэтому новый отзыв сбрасывает только карточку своего
+произведения и страницы, на которых оно показано.
+
+С кешем процесса (LocMemCache) записи других процессов не меняют
+маркеры этого процесса, и устаревший ответ живёт до истечения
+RESPONSE_CACHE_TIMEOUT.
+"""
+from hashlib import md5
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.http import urlencode
+from rest_framework.response import Response
+
+from api.conditional import (
+    GLOBAL_MARKER, ConditionalGetMixin, ResponseReady, get_version_markers)
+
+RESPONSE_CACHE_TIMEOUT = 60 * 10
+RESPONSE_KEY = 'response:{}'
+
+
+def get_marker_tokens(names):
+    return [token for token, _ in get_version_markers(names)]
+
+
+def normalize_query(query_params):
+    """Строка запроса с параметрами по алфавиту и прежним порядком
+    значений одного параметра."""
+    return urlencode(sorted(query_params.lists()), doseq=True)
+
+
+class ResponseCacheMixin(ConditionalGetMixin):
+    """
+    Кеширование JSON-ответов list и retrieve для анонимных клиентов.
+
+    ``get_cache_tags`` возвращает маркеры, от которых зависят данные
+    ответа. Маркеры ``get_version_markers`` читаются до и после
+    построения ответа: если между этими чтениями прошла запись, ответ
+    не кешируется, чтобы не сохранить старые данные с новыми токенами.
+    """
+    response_cache_timeout = RESPONSE_CACHE_TIMEOUT
+    response_cache_key = None
+
+    def get_cache_tags(self, data):
+        return ()
+
+    def get_response_cache_key(self, request):
+        return RESPONSE_KEY.format(md5(repr((
+            request.build_absolute_uri(request.path),
+            normalize_query(request.query_params),
+            request.accepted_media_type,
+        )).encode()).hexdigest())
+
+    def is_response_cacheable(self, request):
+        return (
+            request.method in ('GET', 'HEAD')
+            and self.action in self.conditional_actions
+            and request.user.is_anonymous
+            and request.accepted_renderer.format == 'json'
+        )
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if not self.is_response_cacheable(request):
+            return
+        key = self.get_response_cache_key(request)
+        entry = cache.get(key)
+        if entry is not None:
+            tags, content, content_type = entry
+            if get_marker_tokens(tags) == list(tags.values()):
+                raise ResponseReady(
+                    HttpResponse(content, content_type=content_type))
+        self.response_cache_key = key
+        self.response_cache_guard = get_marker_tokens(
+            self.get_version_markers())
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs)
+        if (
+            self.response_cache_key is None
+            or response.status_code != 200
+            or not isinstance(response, Response)
+        ):
+            return response
+        names = list(dict.fromkeys(
+            (GLOBAL_MARKER, *self.get_cache_tags(response.data))))
+        tokens = get_marker_tokens(names)
+        if get_marker_tokens(
+                self.get_version_markers()) != self.response_cache_guard:
+            return response
+        response.render()
+        cache.set(
+            self.response_cache_key,
+            (dict(zip(names, tokens)), response.content,
+             response['Content-Type']),
+            self.response_cache_timeout)
+        return response
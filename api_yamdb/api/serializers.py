@@ -1,14 +1,34 @@
+from django.utils.encoding import smart_str
+from django.utils.functional import cached_property
 from rest_framework import exceptions, serializers
-from rest_framework.generics import get_object_or_404
 
 from rest_framework.validators import UniqueValidator
 
+from api.readers import comment_reader, review_reader, title_reader
 from reviews.models import Category, Comment, Genre, Title, Review
+from reviews.reference import by_name, reference
+from reviews.utils import bulk_create_reviews, bulk_create_titles
 from users.constants import MAX_LEN_EMAIL, MAX_LEN_USERNAME
-from users.models import MyUser, ROLES
+from users.models import MyUser, ROLES, username_validator
 
 
-class UserSerializer(serializers.ModelSerializer):
+class SparseFieldsMixin:
+    """Оставляет в сериализаторе только поля из аргумента fields."""
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if not fields:
+            return
+        unknown = set(fields) - set(self.fields)
+        if unknown:
+            raise exceptions.ValidationError({
+                'fields': f'Неизвестные поля: {", ".join(sorted(unknown))}'
+            })
+        for name in set(self.fields) - set(fields):
+            self.fields.pop(name)
+
+
+class UserSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализатор для пользователей."""
 
     email = serializers.EmailField(
@@ -33,6 +53,24 @@ class UserSerializer(serializers.ModelSerializer):
         return username
 
 
+class SignUpSerializer(serializers.Serializer):
+    """
+    Сериализатор для регистрации. Проверяет данные без запросов к БД:
+    уникальность имени и почты проверяет INSERT в SignUpView.
+    """
+
+    username = serializers.CharField(
+        max_length=MAX_LEN_USERNAME, validators=[username_validator])
+    email = serializers.EmailField(max_length=MAX_LEN_EMAIL)
+
+    def validate_username(self, username):
+        username = username.lower()
+        if username == "me":
+            raise serializers.ValidationError(
+                'Имя пользователя "me" не доступно для регистрации.')
+        return username
+
+
 class JWTTokenSerializer(serializers.Serializer):
     """Сериализатор для получения токена."""
 
@@ -40,13 +78,15 @@ class JWTTokenSerializer(serializers.Serializer):
     confirmation_code = serializers.CharField()
 
     def validate(self, data):
-        if not MyUser.objects.filter(username=data['username']).exists():
+        user = MyUser.objects.filter(username=data['username']).first()
+        if user is None:
             raise exceptions.NotFound(
                 'Такого пользователя не существует')
+        data['user'] = user
         return data
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализатор для модели Category."""
 
     class Meta:
@@ -54,7 +94,7 @@ class CategorySerializer(serializers.ModelSerializer):
         fields = ('name', 'slug')
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализатор для модели Genre."""
 
     class Meta:
@@ -62,14 +102,91 @@ class GenreSerializer(serializers.ModelSerializer):
         fields = ('name', 'slug')
 
 
+class ReferenceSlugRelatedField(serializers.SlugRelatedField):
+    """SlugRelatedField, находящий категорию или жанр в справочнике."""
+
+    def to_internal_value(self, data):
+        if not isinstance(data, str):
+            self.fail('invalid')
+        obj = reference.get_by_slug(self.get_queryset().model, data)
+        if obj is None:
+            self.fail('does_not_exist', slug_name=self.slug_field,
+                      value=smart_str(data))
+        return obj
+
+
+class TitleCategoryField(serializers.Field):
+    """Категория произведения из справочника по category_id."""
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+        self.serializer = CategorySerializer()
+
+    @cached_property
+    def references(self):
+        return reference.snapshot()
+
+    def get_attribute(self, instance):
+        if not self.references.knows([instance.category_id]):
+            # Категорию мог создать другой процесс.
+            self.references = reference.snapshot([instance.category_id])
+        return self.references.get_by_id(Category, instance.category_id)
+
+    def to_representation(self, category):
+        return self.serializer.to_representation(category)
+
+
+class TitleGenresField(serializers.Field):
+    """
+    Жанры произведения из справочника по маске жанров. Жанры без бита
+    в маске берутся из атрибута ``bitless_genres``, если вьюсет их
+    предзагрузил, иначе отдельным запросом.
+    """
+    relations = ('genre',)
+
+    def __init__(self, **kwargs):
+        kwargs.update(read_only=True, source='genre_mask')
+        super().__init__(**kwargs)
+        self.serializer = GenreSerializer()
+
+    @cached_property
+    def references(self):
+        return reference.snapshot()
+
+    def get_attribute(self, instance):
+        if not self.references.knows(genre_mask=instance.genre_mask):
+            self.references = reference.snapshot(
+                genre_mask=instance.genre_mask)
+        genres, incomplete = self.references.genres_by_mask(
+            instance.genre_mask)
+        if incomplete:
+            # Вьюсет загружает жанры без бита одним запросом на страницу.
+            bitless = getattr(instance, 'bitless_genres', None)
+            if bitless is None:
+                bitless = instance.genre.filter(bit=None)
+            genres = sorted([*genres, *bitless], key=by_name)
+        return genres
+
+    def to_representation(self, genres):
+        return [self.serializer.to_representation(genre) for genre in genres]
+
+
+class TitleListSerializer(serializers.ListSerializer):
+    """Массовое создание произведений через bulk_create."""
+
+    def create(self, validated_data):
+        return bulk_create_titles(validated_data)
+
+
 class TitleCreateSerializer(serializers.ModelSerializer):
     """Сериализатор для изменения произведений."""
-    genre = serializers.SlugRelatedField(
+    genre = ReferenceSlugRelatedField(
         many=True,
         queryset=Genre.objects.all(),
         slug_field='slug'
     )
-    category = serializers.SlugRelatedField(
+    category = ReferenceSlugRelatedField(
         queryset=Category.objects.all(),
         slug_field='slug'
     )
@@ -79,14 +196,17 @@ class TitleCreateSerializer(serializers.ModelSerializer):
         fields = (
             'id', 'name', 'year', 'description', 'genre', 'category'
         )
+        list_serializer_class = TitleListSerializer
 
 
-class TitleReadSerializer(serializers.ModelSerializer):
+class TitleReadSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализатор для получения произведений."""
-    genre = GenreSerializer(read_only=True, many=True)
-    category = CategorySerializer(read_only=True)
+    genre = TitleGenresField()
+    category = TitleCategoryField()
     rating = serializers.IntegerField(read_only=True, required=False)
 
+    values_reader = title_reader
+
     class Meta:
         model = Title
         fields = (
@@ -94,7 +214,7 @@ class TitleReadSerializer(serializers.ModelSerializer):
         )
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализатор для отзывов на произведения."""
 
     author = serializers.SlugRelatedField(
@@ -108,15 +228,14 @@ class ReviewSerializer(serializers.ModelSerializer):
         default=serializers.CurrentUserDefault()
     )
 
+    values_reader = review_reader
+
     class Meta:
         model = Review
         fields = ('id', 'text', 'title', 'author', 'pub_date', 'score')
 
     def validate(self, data):
-        title_id = (
-            self.context['request'].parser_context['kwargs']['title_id']
-        )
-        title = get_object_or_404(Title, pk=title_id)
+        title = self.context['title']
         author = self.context['request'].user
         if (self.context['request'].method == 'POST'
            and Review.objects.filter(title=title, author=author).exists()):
@@ -126,13 +245,89 @@ class ReviewSerializer(serializers.ModelSerializer):
         return data
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class ReviewBulkListSerializer(serializers.ListSerializer):
+    """
+    Пакет отзывов: существование произведений и авторов и уникальность
+    пары (произведение, автор) проверяются для всего пакета тремя
+    запросами, ошибки возвращаются по каждому элементу.
+    """
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list) or not data:
+            return super().to_internal_value(data)
+        items, errors = [], []
+        for item in data:
+            try:
+                items.append(self.child.run_validation(item))
+                errors.append({})
+            except serializers.ValidationError as exc:
+                items.append(None)
+                errors.append(exc.detail)
+        self.validate_batch(items, errors)
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return items
+
+    def validate_batch(self, items, errors):
+        valid = [item for item in items if item is not None]
+        title_ids = set(
+            Title.objects.filter(
+                pk__in={item['title_id'] for item in valid}
+            ).values_list('pk', flat=True))
+        authors = {
+            user.username: user for user in MyUser.objects.filter(
+                username__in={item['author']['username'] for item in valid}
+            ).only('pk', 'username')
+        }
+        taken = set(Review.objects.filter(
+            title_id__in=title_ids,
+            author_id__in=[user.pk for user in authors.values()],
+        ).values_list('title_id', 'author_id'))
+        for item, item_errors in zip(items, errors):
+            if item is None:
+                continue
+            author = authors.get(item['author']['username'])
+            if item['title_id'] not in title_ids:
+                item_errors['title'] = ['Произведение не найдено.']
+            if author is None:
+                item_errors['author'] = ['Пользователь не найден.']
+            if item_errors:
+                continue
+            if (item['title_id'], author.pk) in taken:
+                item_errors['non_field_errors'] = [
+                    'Можно добавить только один отзыв']
+                continue
+            taken.add((item['title_id'], author.pk))
+            item['author'] = author
+
+    def create(self, validated_data):
+        return bulk_create_reviews([Review(**item) for item in validated_data])
+
+
+class ReviewBulkSerializer(serializers.ModelSerializer):
+    """Отзыв из пакета: произведение по id, автор по имени."""
+
+    title = serializers.IntegerField(source='title_id')
+    author = serializers.CharField(
+        source='author.username', max_length=MAX_LEN_USERNAME)
+
+    class Meta:
+        model = Review
+        fields = ('id', 'title', 'author', 'text', 'score', 'pub_date')
+        # Уникальность проверяет ReviewBulkListSerializer.
+        validators = ()
+        list_serializer_class = ReviewBulkListSerializer
+
+
+class CommentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализатор для комментариев к отзывам."""
     author = serializers.SlugRelatedField(
         slug_field="username",
         read_only=True
     )
 
+    values_reader = comment_reader
+
     class Meta:
         model = Comment
         fields = ('id', 'author', 'pub_date', 'text')
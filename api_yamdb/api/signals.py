@@ -0,0 +1,180 @@
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_migrate, post_save, pre_save)
+from django.contrib.auth import get_user_model
+from django.dispatch import receiver
+
+from api.authentication import forget_auth_user
+from api.conditional import GLOBAL_MARKER, bump_version_markers
+from api.pagination import bump_count_generation
+from api.utils import forget_confirmation_code
+from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.utils import bulk_changed
+
+
+# Модели, чьи списки пагинируются, и таблицы, количества строк
+# которых меняет их запись. Рейтинг произведения (отзывы) и маска
+# жанров (удаление жанра) обновляются через update() без сигналов.
+COUNTED_TABLES = {
+    Title: (Title._meta.db_table,),
+    Review: (Review._meta.db_table, Title._meta.db_table),
+    Comment: (Comment._meta.db_table,),
+    Category: (Category._meta.db_table,),
+    Genre: (Genre._meta.db_table, Title._meta.db_table),
+    get_user_model(): (get_user_model()._meta.db_table,),
+}
+
+
+@receiver([post_save, post_delete], sender=Title)
+@receiver([post_save, post_delete], sender=Review)
+@receiver([post_save, post_delete], sender=Comment)
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=Genre)
+@receiver([post_save, post_delete], sender=get_user_model())
+def model_changed(sender, **kwargs):
+    tables = COUNTED_TABLES[sender]
+    transaction.on_commit(lambda: bump_count_generation(*tables))
+
+
+@receiver(m2m_changed)
+def relation_changed(sender, instance, action, model, **kwargs):
+    if not action.startswith('post_'):
+        return
+    # Маска жанров и другие производные поля обновляются через update()
+    # без сигналов, поэтому сбрасываются обе стороны связи.
+    tables = (
+        sender._meta.db_table,
+        instance._meta.db_table,
+        model._meta.db_table,
+    )
+    transaction.on_commit(lambda: bump_count_generation(*tables))
+
+
+@receiver(post_migrate)
+def tables_reset(sender, app_config, **kwargs):
+    # migrate и flush меняют таблицы без сигналов моделей.
+    bump_count_generation(*(
+        model._meta.db_table for model in app_config.get_models()))
+    bump_version_markers(GLOBAL_MARKER)
+
+
+def bump_versions_on_commit(*names):
+    transaction.on_commit(lambda: bump_version_markers(*names))
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+def title_version_changed(sender, instance, **kwargs):
+    # Название произведения выводится и в его отзывах.
+    bump_versions_on_commit(
+        'titles', 'title-index', f'title:{instance.pk}',
+        f'reviews:{instance.pk}')
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def review_version_changed(sender, instance, **kwargs):
+    # Отзыв меняет рейтинг произведения в карточке и в списке.
+    bump_versions_on_commit(
+        'titles', f'title:{instance.title_id}',
+        f'reviews:{instance.title_id}', f'comments:{instance.pk}')
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_version_changed(sender, instance, **kwargs):
+    bump_versions_on_commit(f'comments:{instance.review_id}')
+
+
+CATALOG_MARKERS = {
+    Category: ('categories', 'category'),
+    Genre: ('genres', 'genre'),
+}
+
+
+@receiver(pre_save, sender=Category)
+@receiver(pre_save, sender=Genre)
+def catalog_slug_loaded(sender, instance, **kwargs):
+    if not instance._state.adding:
+        instance._previous_slug = sender.objects.filter(
+            pk=instance.pk).values_list('slug', flat=True).first()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def catalog_version_changed(sender, instance, **kwargs):
+    marker, prefix = CATALOG_MARKERS[sender]
+    names = ['catalog', marker, f'{prefix}:{instance.slug}']
+    previous_slug = getattr(instance, '_previous_slug', None)
+    if previous_slug is not None and previous_slug != instance.slug:
+        # Смена слага меняет результаты фильтров по нему.
+        names += [f'{prefix}:{previous_slug}', 'title-index']
+    bump_versions_on_commit(*names)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_version_changed(sender, instance, action, reverse,
+                                 pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if reverse:
+        # При clear список произведений неизвестен, их записи в кеше
+        # ответов помечены слагом жанра.
+        bump_versions_on_commit(
+            'titles', 'title-index', 'catalog', f'genre:{instance.slug}',
+            *(f'title:{pk}' for pk in pk_set or ()))
+    else:
+        bump_versions_on_commit(
+            'titles', 'title-index', f'title:{instance.pk}')
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def author_version_changed(sender, created=False, **kwargs):
+    # Имена авторов выводятся в отзывах и комментариях.
+    if not created:
+        bump_versions_on_commit('authors')
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def auth_user_changed(sender, instance, created=False, **kwargs):
+    # Роль и флаги пользователя хранятся в claims токенов и в кешах
+    # аутентификации (см. api/authentication.py).
+    if not created:
+        user_id = instance.pk
+        transaction.on_commit(lambda: forget_auth_user(user_id))
+
+
+@receiver(post_delete, sender=get_user_model())
+def confirmation_forgotten(sender, instance, **kwargs):
+    # Иначе регистрация с теми же данными в окне повторной отправки
+    # ответит 200, не создав пользователя заново.
+    username, email = instance.username, instance.email
+    transaction.on_commit(
+        lambda: forget_confirmation_code(username, email))
+
+
+@receiver(bulk_changed)
+def bulk_objects_changed(sender, objects=(), title_ids=(), **kwargs):
+    tables = [sender._meta.db_table] + [
+        field.remote_field.through._meta.db_table
+        for field in sender._meta.many_to_many
+    ]
+    if sender is Review:
+        # Агрегаты оценок произведений меняются через update().
+        tables.append(Title._meta.db_table)
+    transaction.on_commit(lambda: bump_count_generation(*tables))
+    # 'titles' идёт первым: кеш ответов сверяет его до и после чтения.
+    names = ['titles']
+    if sender is Title:
+        names.append('title-index')
+        for title in objects:
+            names += [f'title:{title.pk}', f'reviews:{title.pk}']
+    elif sender is Review:
+        for title_id in {review.title_id for review in objects} | set(
+                title_ids):
+            names += [f'title:{title_id}', f'reviews:{title_id}']
+    bump_versions_on_commit(*names)
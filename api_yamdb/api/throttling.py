@@ -0,0 +1,122 @@
+"""
+Ограничение частоты запросов на счётчиках в кеше.
+
+SimpleRateThrottle из DRF хранит в кеше список времён запросов и
+перезаписывает его целиком, поэтому параллельные запросы теряют
+отметки друг друга. Здесь используется скользящее окно из двух
+счётчиков: текущего и предыдущего окна длиной в период ограничения.
+Счётчик текущего окна увеличивается атомарным cache.incr, а число
+запросов за последний период оценивается как
+
+    предыдущий * (доля периода, ещё не прошедшая) + текущий.
+
+Отклонённые запросы тоже учитываются, поэтому клиент, продолжающий
+слать запросы, остаётся ограниченным. БД при проверке не используется.
+Частоты задаются по scope в ``DEFAULT_THROTTLE_RATES``.
+"""
+import math
+
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+THROTTLE_KEY = 'throttle:{scope}:{ident}:{window}'
+
+
+class CacheRateThrottle(SimpleRateThrottle):
+    """
+    Скользящее окно на атомарных счётчиках. Подклассы определяют
+    get_cache_key, как и для SimpleRateThrottle.
+    """
+
+    def get_rate(self):
+        # Частоты читаются при каждом запросе, а не при импорте модуля,
+        # чтобы их можно было поменять в настройках тестов.
+        self.THROTTLE_RATES = api_settings.DEFAULT_THROTTLE_RATES
+        return super().get_rate()
+
+    def increment(self, key, timeout):
+        self.cache.add(key, 0, timeout)
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            # Счётчик истёк между add и incr.
+            self.cache.add(key, 1, timeout)
+            return 1
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        ident = self.get_cache_key(request, view)
+        if ident is None:
+            return True
+        position = self.timer() / self.duration
+        window = math.floor(position)
+        self.elapsed = position - window
+        key = THROTTLE_KEY.format(scope=self.scope, ident=ident, window='{}')
+        self.current = self.increment(
+            key.format(window), timeout=2 * self.duration)
+        self.previous = self.cache.get(key.format(window - 1), 0)
+        return self.estimate() <= self.num_requests
+
+    def estimate(self):
+        return self.previous * (1 - self.elapsed) + self.current
+
+    def wait(self):
+        """Секунды, через которые оценка опустится до предела."""
+        limit = self.num_requests
+        if self.current < limit:
+            # Хватит того, что предыдущее окно уйдёт дальше в прошлое.
+            return max(
+                0, (1 - (limit - self.current) / self.previous)
+                - self.elapsed) * self.duration
+        # В следующем окне текущий счётчик станет предыдущим.
+        return (
+            1 - self.elapsed + max(0, 1 - limit / self.current)
+        ) * self.duration
+
+
+class AnonRateThrottle(CacheRateThrottle):
+    """Все запросы анонимного клиента по его IP (scope ``anon``)."""
+
+    scope = 'anon'
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return None
+        return self.get_ident(request)
+
+
+class UserRateThrottle(CacheRateThrottle):
+    """Все запросы аутентифицированного пользователя (scope ``user``)."""
+
+    scope = 'user'
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return request.user.pk
+        return None
+
+
+class WriteRateThrottle(CacheRateThrottle):
+    """
+    Запросы на запись к эндпоинту с атрибутом ``throttle_scope``:
+    от пользователя - по его id, от анонима - по IP.
+    """
+
+    def __init__(self):
+        # Частота зависит от вьюкласса и определяется в allow_request.
+        pass
+
+    def allow_request(self, request, view):
+        self.scope = getattr(view, 'throttle_scope', None)
+        if not self.scope or request.method in SAFE_METHODS:
+            return True
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return super().allow_request(request, view)
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return f'user-{request.user.pk}'
+        return self.get_ident(request)
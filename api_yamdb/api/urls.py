@@ -2,9 +2,11 @@ from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
 from api.views import (
+    AutocompleteView,
     CategoryViewSet,
     CommentViewSet,
     GenreViewSet,
+    ReviewBulkView,
     ReviewViewSet,
     TitleViewSet,
     APITokenView,
@@ -27,6 +29,9 @@ router.register(
 
 urlpatterns = [
     path('v1/', include(router.urls)),
+    path('v1/reviews/bulk/', ReviewBulkView.as_view(), name='reviews-bulk'),
     path('v1/auth/signup/', SignUpView.as_view(), name='signup'),
     path('v1/auth/token/', APITokenView.as_view(), name='token'),
+    path(
+        'v1/autocomplete/', AutocompleteView.as_view(), name='autocomplete'),
 ]
@@ -1,14 +1,63 @@
+from contextlib import nullcontext
+from hashlib import md5
+
 from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from django.shortcuts import get_object_or_404
-from users.models import MyUser
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+
+from api.constants import SIGNUP_RESEND_WINDOW
+from users.outbox import enqueue_email
+
+CONFIRMATION_KEY = 'confirmation:{}'
+
+
+def confirmation_key(username, email):
+    return CONFIRMATION_KEY.format(
+        md5(repr((username, email)).encode()).hexdigest())
+
 
+def get_pending_confirmation_code(username, email):
+    """Код, высланный этой паре имени и почты в текущем окне, или None."""
+    return cache.get(confirmation_key(username, email))
 
-def send_confirmation_code_on_email(username, email):
-    user = get_object_or_404(MyUser, username=username)
+
+def forget_confirmation_code(username, email):
+    cache.delete(confirmation_key(username, email))
+
+
+def send_confirmation_code_on_email(user):
+    """
+    Ставит письмо с кодом подтверждения в очередь. Повторные вызовы
+    для той же пары имени и почты в течение SIGNUP_RESEND_WINDOW
+    секунд письма не ставят: пользователь получает код из первого
+    письма, он остаётся действительным. Окно хранится в общем кеше,
+    поэтому действует для всех процессов. Возвращает, поставлено ли
+    письмо.
+    """
     confirmation_code = default_token_generator.make_token(user)
-    send_mail(subject='Confirmation code for YaMDb',
-              message=f'Ваш код {confirmation_code}',
-              from_email=settings.DEFAULT_FROM_EMAIL,
-              recipient_list=[email])
+    if not cache.add(
+            confirmation_key(user.username, user.email), confirmation_code,
+            getattr(settings, 'SIGNUP_RESEND_WINDOW', SIGNUP_RESEND_WINDOW)):
+        return False
+    enqueue_email(subject='Confirmation code for YaMDb',
+                  body=f'Ваш код {confirmation_code}',
+                  to=user.email)
+    return True
+
+
+def insert_user(user):
+    """
+    Сохраняет нового пользователя одним INSERT и возвращает False,
+    если имя или почта уже заняты. Внутри транзакции INSERT идёт
+    в точке сохранения, чтобы ошибка уникальности её не прервала.
+    """
+    savepoint = (
+        transaction.atomic() if connection.in_atomic_block
+        else nullcontext())
+    try:
+        with savepoint:
+            user.save(force_insert=True)
+    except IntegrityError:
+        return False
+    return True
@@ -1,84 +1,172 @@
 from django.contrib.auth.tokens import default_token_generator
+from django.db.models import Prefetch, Q
 from django.shortcuts import get_object_or_404
-from django.db.models import Avg
+from django.utils.functional import cached_property
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import AccessToken
 
+from api.authentication import access_token_for_user
+from api.conditional import ConditionalGetMixin
+from api.constants import REVIEWS_BULK_MAX_ITEMS, TITLES_BULK_MAX_ITEMS
 from api.filters import TitleFilter
-from api.mixins import MixinViewSet
+from api.mixins import MixinViewSet, SparseFieldsViewMixin, ValuesListMixin
 from api.permissions import (
     IsAdmin,
     IsAdminOrIsModeratorOrIsUser,
     IsAdminOrReadOnly)
+from api.query_budget import set_query_action
+from api.response_cache import ResponseCacheMixin
 from api.serializers import (
     JWTTokenSerializer,
+    SignUpSerializer,
     UserSerializer,
     CategorySerializer,
     GenreSerializer,
     TitleCreateSerializer,
     TitleReadSerializer,
     CommentSerializer,
+    ReviewBulkSerializer,
     ReviewSerializer)
-from api.utils import send_confirmation_code_on_email
+from api.utils import (
+    get_pending_confirmation_code,
+    insert_user,
+    send_confirmation_code_on_email)
+from reviews.autocomplete import DEFAULT_LIMIT, MAX_LIMIT, autocomplete
 from reviews.models import Review, Category, Genre, Title
+from reviews.reference import reference
+from reviews.utils import cascade_delete
 from users.models import MyUser
 
 
 class SignUpView(APIView):
-    """Вьюкласс для регистрации пользователей."""
+    """
+    Вьюкласс для регистрации пользователей.
+
+    Новый пользователь сохраняется сразу, без проверок уникальности
+    заранее: INSERT и письмо в очередь - два запроса. Только если
+    INSERT упёрся в занятые имя или почту, пользователь читается,
+    чтобы повторно выслать код или вернуть ошибку; этот путь
+    учитывается как действие ``conflict`` и занимает до трёх запросов.
+    Повтор регистрации, которой код уже выслан в текущем окне,
+    отвечает без запросов к БД.
+    """
 
     permission_classes = (AllowAny,)
+    throttle_scope = 'signup'
+    # conflict: неудачный INSERT, чтение пользователя и письмо в очередь.
+    query_budget = {'post': 2, 'conflict': 3}
 
     def post(self, request):
-        serializer = UserSerializer(data=request.data)
-        user = MyUser.objects.filter(
-            username=request.data.get("username"),
-            email=request.data.get("email")
-        ).first()
-
-        if user:
-            send_confirmation_code_on_email(user.username, user.email)
+        serializer = SignUpSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        username = serializer.validated_data['username']
+        email = serializer.validated_data['email']
+        if get_pending_confirmation_code(username, email) is not None:
             return Response(status=status.HTTP_200_OK)
-
-        if serializer.is_valid():
-            try:
-                MyUser.objects.get_or_create(
-                    username=serializer.data.get('username'),
-                    email=serializer.data.get('email'))
-            except Exception:
-                return Response(status=status.HTTP_400_BAD_REQUEST)
-            send_confirmation_code_on_email(
-                serializer.data['username'], serializer.data['email'])
+        user = MyUser(username=username, email=email)
+        if insert_user(user):
+            send_confirmation_code_on_email(user)
             return Response(serializer.data, status=status.HTTP_200_OK)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        set_query_action(request, self, 'conflict')
+        errors = {}
+        for user in MyUser.objects.filter(
+                Q(username=username) | Q(email=email)):
+            if user.username == username and user.email == email:
+                send_confirmation_code_on_email(user)
+                return Response(status=status.HTTP_200_OK)
+            if user.username == username:
+                errors['username'] = [
+                    'Пользователь с таким именем уже существует.']
+            if user.email == email:
+                errors['email'] = [
+                    'Пользователь с такой почтой уже существует.']
+        return Response(
+            errors or {'non_field_errors': ['Не удалось зарегистрироваться.']},
+            status=status.HTTP_400_BAD_REQUEST)
 
 
 class APITokenView(APIView):
     """Вьюкласс для получения токена."""
 
     permission_classes = (AllowAny,)
+    throttle_scope = 'token'
+    query_budget = {'post': 1}
 
     def post(self, request):
         serializer = JWTTokenSerializer(data=request.data)
-        if serializer.is_valid(raise_exception=True):
-            user = get_object_or_404(
-                MyUser, username=serializer.data['username'])
-            if default_token_generator.check_token(
-               user, serializer.data['confirmation_code']):
-                token = AccessToken.for_user(user)
-                return Response(
-                    {'token': str(token)}, status=status.HTTP_200_OK)
+        serializer.is_valid(raise_exception=True)
+        user = serializer.validated_data['user']
+        if default_token_generator.check_token(
+                user, serializer.validated_data['confirmation_code']):
+            token = access_token_for_user(user)
+            return Response(
+                {'token': str(token)}, status=status.HTTP_200_OK)
+        return Response(
+            {'confirmation_code': 'Неверный код подтверждения'},
+            status=status.HTTP_400_BAD_REQUEST)
+
+
+class AutocompleteView(APIView):
+    """
+    Вьюкласс автодополнения по произведениям, жанрам и категориям.
+    Отвечает из префиксного индекса в памяти, не обращаясь к БД.
+    """
+
+    authentication_classes = ()
+    permission_classes = (AllowAny,)
+    query_budget = {'get': 0}
+
+    def get(self, request):
+        prefix = request.query_params.get('q', '').strip()
+        kinds = [
+            kind for kind in request.query_params.get('type', '').split(',')
+            if kind
+        ] or list(autocomplete.sources)
+        unknown = set(kinds) - set(autocomplete.sources)
+        if unknown:
+            return Response(
+                {'type': f'Неизвестный тип: {", ".join(sorted(unknown))}'},
+                status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(
+                int(request.query_params.get('limit', DEFAULT_LIMIT)),
+                MAX_LIMIT)
+        except ValueError:
+            limit = DEFAULT_LIMIT
+        if not prefix or limit < 1:
+            return Response({kind: [] for kind in kinds})
+        return Response(autocomplete.search(prefix, kinds, limit))
+
+
+class ReviewBulkView(APIView):
+    """
+    Вьюкласс массовой загрузки отзывов партнёров администратором.
+    Если хотя бы один отзыв не прошёл проверку, ничего не создаётся.
+    """
+
+    permission_classes = (IsAdmin,)
+    # Бюджета нет: число INSERT и UPDATE растёт с размером пакета.
+
+    def post(self, request):
+        if isinstance(request.data, list) and (
+                len(request.data) > REVIEWS_BULK_MAX_ITEMS):
             return Response(
-                {'confirmation_code': 'Неверный код подтверждения'},
+                {'non_field_errors': [
+                    f'Не больше {REVIEWS_BULK_MAX_ITEMS} отзывов '
+                    'за запрос.']},
                 status=status.HTTP_400_BAD_REQUEST)
+        serializer = ReviewBulkSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(SparseFieldsViewMixin, viewsets.ModelViewSet):
     """ViewSet для работы админа с пользователями."""
 
     queryset = MyUser.objects.all()
@@ -88,12 +176,23 @@ class UserViewSet(viewsets.ModelViewSet):
     search_fields = ('username',)
     lookup_field = 'username'
     http_method_names = ['get', 'post', 'delete', 'patch', ]
+    query_budget = {
+        'list': 3, 'retrieve': 2, 'create': 4, 'partial_update': 3,
+        'destroy': 13, 'me': 3,
+    }
+
+    def perform_destroy(self, instance):
+        cascade_delete(instance)
 
     @action(detail=False, methods=('get', 'patch'),
             url_name='me', permission_classes=(IsAuthenticated,))
     def me(self, request):
+        # В request.user загружены только поля для проверки прав.
+        user = MyUser.objects.get(pk=request.user.pk)
+        if request.method == 'GET':
+            return Response(UserSerializer(user).data)
         serializer = UserSerializer(
-            request.user,
+            user,
             data=request.data,
             partial=True)
         if serializer.is_valid():
@@ -107,6 +206,7 @@ class CategoryViewSet(MixinViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = (IsAdminOrReadOnly,)
+    version_marker = 'categories'
 
 
 class GenreViewSet(MixinViewSet):
@@ -114,36 +214,125 @@ class GenreViewSet(MixinViewSet):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     permission_classes = (IsAdminOrReadOnly,)
+    version_marker = 'genres'
+    # Выбор бита для маски жанров и очистка маски при удалении.
+    query_budget = {'list': 3, 'create': 4, 'destroy': 6}
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(ResponseCacheMixin, ValuesListMixin,
+                   SparseFieldsViewMixin, viewsets.ModelViewSet):
     """ViewSet для модели Title."""
-    queryset = Title.objects.annotate(
-        rating=Avg('reviews__score')).order_by('name')
+    # Категории и жанры сериализатор берёт из reviews.reference.
+    queryset = Title.objects.order_by('name')
     permission_classes = (IsAdminOrReadOnly,)
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
+    keyset_ordering = ('name', 'id')
     http_method_names = ['get', 'post', 'delete', 'patch']
+    # Для list, retrieve и partial_update учтена перестройка справочника
+    # после записи. partial_update со сменой жанров: set() читает связи,
+    # удаляет и добавляет их и дважды сдвигает маску жанров.
+    # У bulk бюджета нет: число INSERT растёт с размером пакета.
+    query_budget = {
+        'list': 4, 'retrieve': 3, 'create': 12, 'partial_update': 14,
+        'destroy': 9,
+    }
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ('list', 'retrieve') and (
+                reference.snapshot().has_bitless_genres):
+            # Жанрам сверх MAX_GENRE_BITS нет места в маске: они
+            # загружаются одним запросом на страницу, а не на каждое
+            # произведение. Читатель values() предзагрузку отбрасывает.
+            queryset = queryset.prefetch_related(Prefetch(
+                'genre', queryset=Genre.objects.filter(bit=None),
+                to_attr='bitless_genres'))
+        return queryset
 
     def get_serializer_class(self):
         if self.action in ('list', 'retrieve'):
             return TitleReadSerializer
         return TitleCreateSerializer
 
-
-class ReviewViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=('post',), url_path='bulk',
+            permission_classes=(IsAdmin,))
+    def bulk(self, request):
+        """
+        Создание списка произведений одним запросом. Если хотя бы одно
+        не прошло проверку, ничего не создаётся, а ответ содержит
+        ошибки по каждому элементу списка.
+        """
+        if isinstance(request.data, list) and (
+                len(request.data) > TITLES_BULK_MAX_ITEMS):
+            return Response(
+                {'non_field_errors': [
+                    f'Не больше {TITLES_BULK_MAX_ITEMS} произведений '
+                    'за запрос.']},
+                status=status.HTTP_400_BAD_REQUEST)
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def perform_destroy(self, instance):
+        cascade_delete(instance)
+
+    def get_version_markers(self):
+        if self.action == 'retrieve':
+            return ('catalog', f'title:{self.kwargs["pk"]}')
+        return ('catalog', 'titles')
+
+    def get_cache_tags(self, data):
+        if self.action == 'retrieve':
+            items, tags = [data], [f'title:{self.kwargs["pk"]}']
+        else:
+            items = data['results'] if isinstance(data, dict) else data
+            # Состав и порядок списка меняются только при записи
+            # произведений, рейтинг - при записи отзывов.
+            tags = ['title-index']
+        for item in items:
+            tags.append(f'title:{item["id"]}' if 'id' in item else 'titles')
+            tags.extend(
+                f'genre:{genre["slug"]}' for genre in item.get('genre', ()))
+            if item.get('category'):
+                tags.append(f'category:{item["category"]["slug"]}')
+        return tags
+
+
+class ReviewViewSet(ConditionalGetMixin, ValuesListMixin,
+                    SparseFieldsViewMixin, viewsets.ModelViewSet):
     """ViewSet для модели Review."""
     serializer_class = ReviewSerializer
     permission_classes = (IsAdminOrIsModeratorOrIsUser,)
+    throttle_scope = 'reviews'
+    keyset_ordering = ('pub_date', 'id')
     http_method_names = ['get', 'post', 'delete', 'patch', ]
+    query_budget = {
+        'list': 4, 'retrieve': 3, 'create': 6, 'partial_update': 6,
+        'destroy': 8,
+    }
+
+    @cached_property
+    def title(self):
+        return get_object_or_404(Title, pk=self.kwargs.get("title_id"))
 
     def get_queryset(self):
-        title = get_object_or_404(Title, pk=self.kwargs.get("title_id"))
-        return title.reviews.all()
+        return self.title.reviews.select_related('author')
+
+    def get_version_markers(self):
+        return ('authors', f'reviews:{self.kwargs["title_id"]}')
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['title'] = self.title
+        return context
 
     def perform_create(self, serializer):
-        title = get_object_or_404(Title, pk=self.kwargs.get("title_id"))
-        serializer.save(author=self.request.user, title=title)
+        serializer.save(author=self.request.user, title=self.title)
+
+    def perform_destroy(self, instance):
+        cascade_delete(instance)
 
     def update(self, request, *args, **kwargs):
         if request.method == 'PUT':
@@ -153,21 +342,38 @@ class ReviewViewSet(viewsets.ModelViewSet):
         return super().update(request, *args, **kwargs)
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ConditionalGetMixin, ValuesListMixin,
+                     SparseFieldsViewMixin, viewsets.ModelViewSet):
     """ViewSet для модели Comment."""
     serializer_class = CommentSerializer
     permission_classes = (IsAdminOrIsModeratorOrIsUser,)
+    throttle_scope = 'comments'
+    keyset_ordering = ('pub_date', 'id')
     http_method_names = ['get', 'post', 'delete', 'patch', ]
+    query_budget = {
+        'list': 4, 'retrieve': 3, 'create': 3, 'partial_update': 4,
+        'destroy': 4,
+    }
+
+    @cached_property
+    def review(self):
+        return get_object_or_404(
+            Review,
+            pk=self.kwargs.get("review_id"),
+            title=self.kwargs.get("title_id"))
 
     def get_queryset(self):
-        review = get_object_or_404(Review, pk=self.kwargs.get("review_id"))
-        return review.comments.all()
+        return self.review.comments.select_related('author')
+
+    def get_version_markers(self):
+        # Маркер отзывов произведения сбрасывается и при удалении
+        # произведения, комментарии которого удаляются без сигналов.
+        return (
+            'authors', f'reviews:{self.kwargs["title_id"]}',
+            f'comments:{self.kwargs["review_id"]}')
 
     def perform_create(self, serializer):
-        title_id = self.kwargs.get("title_id")
-        review_id = self.kwargs.get("review_id")
-        review = get_object_or_404(Review, pk=review_id, title=title_id)
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(author=self.request.user, review=self.review)
 
     def update(self, request, *args, **kwargs):
         if request.method == 'PUT':
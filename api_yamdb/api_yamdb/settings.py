@@ -30,6 +30,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'api.query_budget.QueryBudgetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -71,6 +72,21 @@ DATABASES = {
 }
 
 
+# Cache
+# Кеш хранит количества строк для пагинации, поколения индексов,
+# счётчики ограничения частоты и поколения пользователей для
+# аутентификации. При нескольких процессах нужен общий бэкенд
+# (Memcached, Redis): с LocMemCache аутентификация читает пользователя
+# из БД на каждый запрос, а ETag и Last-Modified не отдаются
+# (см. AUTH_CACHE_SHARED и api/authentication.py).
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -114,16 +130,74 @@ REST_FRAMEWORK = {
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
+    ],
+
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
 
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.KeysetPagination',
     'PAGE_SIZE': 5,
+
+    # Счётчики хранятся в кеше (см. api/throttling.py): для нескольких
+    # процессов нужен общий бэкенд кеша.
+    'DEFAULT_THROTTLE_CLASSES': [
+        'api.throttling.AnonRateThrottle',
+        'api.throttling.UserRateThrottle',
+        'api.throttling.WriteRateThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'anon': '600/min',
+        'user': '1200/min',
+        'signup': '10/min',
+        'token': '20/min',
+        'reviews': '30/min',
+        'comments': '60/min',
+    },
+}
+
+# Учёт SQL-запросов по эндпоинтам (см. api/query_budget.py).
+# В продакшене SAMPLE_RATE стоит снизить, например до 0.01.
+QUERY_BUDGET = {
+    'ENABLED': True,
+    'SAMPLE_RATE': 1.0,
+    'HEADERS': True,
 }
 
+# Пользователей в LRU-кеше аутентификации процесса (api/authentication.py).
+AUTH_USER_CACHE_SIZE = 10000
+# Общий ли кеш для процессов: тогда роль берётся из claims и LRU без
+# запроса к БД и отдаются ETag и Last-Modified (api/conditional.py).
+# None - общий, если это не LocMemCache и не DummyCache.
+AUTH_CACHE_SHARED = None
+# Проверенные токены: сколько помнить и сколько секунд (не дольше exp).
+VERIFIED_TOKEN_CACHE_SIZE = 10000
+VERIFIED_TOKEN_TTL = 5 * 60
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=30),
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+
+# Очередь писем (см. users/outbox.py): письма отправляет команда
+# send_queued_emails --loop, запущенная рядом с приложением.
+EMAIL_OUTBOX = {
+    'EAGER': False,
+    'BATCH_SIZE': 100,
+    'MAX_ATTEMPTS': 5,
+    'RETRY_DELAY': 60,
+}
+
+# Секунды, в течение которых повторные регистрации той же пары имени
+# и почты не высылают новое письмо с кодом.
+SIGNUP_RESEND_WINDOW = 60
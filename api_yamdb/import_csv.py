@@ -63,8 +63,9 @@ with open(os.path.join(current_dir, 'static/data/titles.csv'), 'r',
         i['year'],
         i['category']) for i in dr]
     cur.executemany("INSERT INTO reviews_title"
-                    "(id, name, year, category_id)"
-                    "VALUES (?, ?, ?, ?);", to_db)
+                    "(id, name, year, category_id,"
+                    "score_sum, review_count, genre_mask)"
+                    "VALUES (?, ?, ?, ?, 0, 0, 0);", to_db)
     con.commit()
 
 
@@ -112,6 +113,24 @@ with open(os.path.join(current_dir, 'static/data/comments.csv'), 'r',
     con.commit()
 
 
+cur.execute("UPDATE reviews_title SET "
+            "score_sum = COALESCE((SELECT SUM(score) FROM reviews_review "
+            "WHERE title_id = reviews_title.id), 0), "
+            "review_count = (SELECT COUNT(*) FROM reviews_review "
+            "WHERE title_id = reviews_title.id);")
+cur.execute("UPDATE reviews_title SET "
+            "rating = score_sum / NULLIF(review_count, 0);")
+cur.execute("UPDATE reviews_genre SET bit = (SELECT COUNT(*) "
+            "FROM reviews_genre AS g WHERE g.id < reviews_genre.id) "
+            "WHERE bit IS NULL AND (SELECT COUNT(*) FROM reviews_genre AS g "
+            "WHERE g.id < reviews_genre.id) < 63;")
+cur.execute("UPDATE reviews_title SET genre_mask = COALESCE(("
+            "SELECT SUM(1 << g.bit) FROM reviews_title_genre AS tg "
+            "JOIN reviews_genre AS g ON g.id = tg.genre_id "
+            "WHERE tg.title_id = reviews_title.id AND g.bit IS NOT NULL), 0);")
+con.commit()
+
+
 con.close()
 
 print('Данные успешно импортированы.')
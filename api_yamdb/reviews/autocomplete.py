@@ -0,0 +1,174 @@
+"""
+Префиксный индекс названий и слагов для автодополнения.
+
+Индекс хранится в памяти процесса в виде отсортированных списков
+ключей, поиск идёт двоичным поиском и не обращается к БД.
+Сигналы моделей (см. reviews.signals) обновляют индекс точечно.
+Номер поколения индекса хранится в кеше Django: если другой процесс
+изменил данные, индекс этого процесса будет перестроен при следующем
+запросе. С кешем процесса (LocMemCache) чужие изменения поколение
+не меняют, поэтому индекс перестраивается и по возрасту: не реже раза
+в AUTOCOMPLETE_MAX_AGE секунд.
+"""
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.core.cache import cache
+
+from reviews.models import Category, Genre, Title
+
+GENERATION_KEY = 'autocomplete:generation'
+AUTOCOMPLETE_MAX_AGE = 60
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+
+def normalize(value):
+    return value.casefold().replace('ё', 'е')
+
+
+class PrefixIndex:
+    """Отсортированный массив пар (ключ, id) с данными объектов."""
+
+    def __init__(self):
+        self._entries = []
+        self._keys_by_id = {}
+        self._payloads = {}
+
+    def __len__(self):
+        return len(self._payloads)
+
+    def add(self, obj_id, keys, payload):
+        self.remove(obj_id)
+        keys = {normalize(key) for key in keys if key}
+        for key in keys:
+            insort(self._entries, (key, obj_id))
+        self._keys_by_id[obj_id] = keys
+        self._payloads[obj_id] = payload
+
+    def remove(self, obj_id):
+        for key in self._keys_by_id.pop(obj_id, ()):
+            position = bisect_left(self._entries, (key, obj_id))
+            if (position < len(self._entries)
+                    and self._entries[position] == (key, obj_id)):
+                del self._entries[position]
+        self._payloads.pop(obj_id, None)
+
+    def search(self, prefix, limit):
+        prefix = normalize(prefix)
+        result = []
+        seen = set()
+        position = bisect_left(self._entries, (prefix,))
+        while position < len(self._entries) and len(result) < limit:
+            key, obj_id = self._entries[position]
+            if not key.startswith(prefix):
+                break
+            if obj_id not in seen:
+                seen.add(obj_id)
+                result.append(self._payloads[obj_id])
+            position += 1
+        return result
+
+
+def title_keys(title):
+    return [title.name, *re.findall(r'\w+', title.name)]
+
+
+def title_payload(title):
+    return {'id': title.pk, 'name': title.name}
+
+
+def slug_keys(obj):
+    return [obj.name, obj.slug, *re.findall(r'\w+', obj.name)]
+
+
+def slug_payload(obj):
+    return {'name': obj.name, 'slug': obj.slug}
+
+
+class Autocomplete:
+    """Индексы автодополнения по произведениям, жанрам и категориям."""
+
+    sources = {
+        'titles': (Title, ('id', 'name'), title_keys, title_payload),
+        'genres': (Genre, ('id', 'name', 'slug'), slug_keys, slug_payload),
+        'categories': (
+            Category, ('id', 'name', 'slug'), slug_keys, slug_payload),
+    }
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._indexes = None
+        self._generation = None
+        self._built = None
+
+    def _build(self):
+        indexes = {}
+        for kind, (model, fields, get_keys, get_payload) in (
+                self.sources.items()):
+            index = PrefixIndex()
+            for obj in model.objects.only(*fields).order_by():
+                index.add(obj.pk, get_keys(obj), get_payload(obj))
+            indexes[kind] = index
+        return indexes
+
+    def _ensure_fresh(self):
+        generation = cache.get_or_set(GENERATION_KEY, 1, None)
+        if self._indexes is None or generation != self._generation or (
+                time.monotonic() - self._built > AUTOCOMPLETE_MAX_AGE):
+            self._indexes = self._build()
+            self._generation = generation
+            self._built = time.monotonic()
+
+    def _bump_generation(self):
+        try:
+            generation = cache.incr(GENERATION_KEY)
+        except ValueError:
+            cache.set(GENERATION_KEY, 1, None)
+            generation = 1
+        if self._generation is not None and (
+                generation == self._generation + 1):
+            # Изменения этого процесса уже учтены точечно, полная
+            # перестройка нужна только после чужих изменений.
+            self._generation = generation
+
+    def search(self, prefix, kinds=None, limit=DEFAULT_LIMIT):
+        with self._lock:
+            self._ensure_fresh()
+            return {
+                kind: self._indexes[kind].search(prefix, limit)
+                for kind in (kinds or self.sources)
+            }
+
+    def _kind_for(self, model):
+        for kind, (source_model, _, _, _) in self.sources.items():
+            if source_model is model:
+                return kind
+        return None
+
+    def update(self, obj):
+        kind = self._kind_for(type(obj))
+        with self._lock:
+            if self._indexes is not None:
+                _, _, get_keys, get_payload = self.sources[kind]
+                self._indexes[kind].add(
+                    obj.pk, get_keys(obj), get_payload(obj))
+            self._bump_generation()
+
+    def remove(self, obj):
+        kind = self._kind_for(type(obj))
+        with self._lock:
+            if self._indexes is not None:
+                self._indexes[kind].remove(obj.pk)
+            self._bump_generation()
+
+    def invalidate(self):
+        """Сбрасывает индексы во всех процессах после массовых изменений."""
+        with self._lock:
+            self._indexes = None
+            self._bump_generation()
+
+
+autocomplete = Autocomplete()
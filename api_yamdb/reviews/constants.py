@@ -1,3 +1,4 @@
 MAX_LEN_TEXT = 30
 MAX_LEN_NAME = 256
 MAX_LEN_SLUG = 50
+MAX_GENRE_BITS = 63
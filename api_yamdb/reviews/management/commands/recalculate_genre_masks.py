@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.conditional import GLOBAL_MARKER, bump_version_markers
+from reviews.utils import recalculate_genre_masks
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает маски жанров произведений по таблице связей.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            updated = recalculate_genre_masks()
+        # Маска меняется через update() без сигналов.
+        bump_version_markers(GLOBAL_MARKER)
+        self.stdout.write(self.style.SUCCESS(
+            f'Маски жанров пересчитаны для {updated} произведений.'))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.conditional import GLOBAL_MARKER, bump_version_markers
+from reviews.utils import recalculate_ratings
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает сумму оценок, число отзывов и рейтинг произведений.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            updated = recalculate_ratings()
+        # Рейтинг меняется через update() без сигналов.
+        bump_version_markers(GLOBAL_MARKER)
+        self.stdout.write(self.style.SUCCESS(
+            f'Рейтинг пересчитан для {updated} произведений.'))
@@ -1,7 +1,8 @@
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
 
-from reviews.constants import MAX_LEN_NAME, MAX_LEN_SLUG, MAX_LEN_TEXT
+from reviews.constants import (
+    MAX_GENRE_BITS, MAX_LEN_NAME, MAX_LEN_SLUG, MAX_LEN_TEXT)
 from reviews.validator import validate_year
 from users.models import MyUser
 
@@ -38,6 +39,12 @@ class Genre(models.Model):
         unique=True,
         max_length=MAX_LEN_SLUG
     )
+    bit = models.PositiveSmallIntegerField(
+        verbose_name='Номер бита в маске жанров',
+        unique=True,
+        null=True,
+        editable=False
+    )
 
     class Meta:
         ordering = ('name',)
@@ -47,6 +54,21 @@ class Genre(models.Model):
     def __str__(self):
         return self.name
 
+    @property
+    def mask(self):
+        return 0 if self.bit is None else 1 << self.bit
+
+    def save(self, *args, **kwargs):
+        if self._state.adding and self.bit is None:
+            used = set(
+                Genre.objects.exclude(bit=None).values_list('bit', flat=True))
+            # Жанрам сверх MAX_GENRE_BITS бит не достаётся, фильтр
+            # по ним работает через таблицу связей.
+            self.bit = next(
+                (bit for bit in range(MAX_GENRE_BITS) if bit not in used),
+                None)
+        super().save(*args, **kwargs)
+
 
 class Title(models.Model):
     """Модель произведений."""
@@ -68,6 +90,11 @@ class Title(models.Model):
         Genre,
         verbose_name='Жанр произведения'
     )
+    genre_mask = models.BigIntegerField(
+        verbose_name='Битовая маска жанров',
+        default=0,
+        editable=False
+    )
     category = models.ForeignKey(
         Category,
         verbose_name='Категория произведения',
@@ -75,15 +102,52 @@ class Title(models.Model):
         on_delete=models.SET_NULL,
         null=True
     )
+    score_sum = models.PositiveIntegerField(
+        verbose_name='Сумма оценок',
+        default=0,
+        editable=False
+    )
+    review_count = models.PositiveIntegerField(
+        verbose_name='Количество отзывов',
+        default=0,
+        editable=False
+    )
+    rating = models.PositiveSmallIntegerField(
+        verbose_name='Рейтинг произведения',
+        null=True,
+        editable=False
+    )
 
     class Meta:
         ordering = ('name',)
+        indexes = (
+            models.Index(fields=('name',), name='title_name_idx'),
+            models.Index(fields=('year', 'name'), name='title_year_name_idx'),
+            models.Index(
+                fields=('category', 'name'), name='title_category_name_idx'),
+        )
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
 
+    # Производные столбцы меняются только UPDATE с F()-выражениями
+    # (см. reviews.utils), editable=False не убирает их из save().
+    DERIVED_FIELDS = ('genre_mask', 'score_sum', 'review_count', 'rating')
+
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        # Иначе save() загруженного ранее объекта перезапишет агрегаты
+        # и маску жанров, изменённые с тех пор отзывами и жанрами.
+        if not self._state.adding and not kwargs.get('force_insert') and (
+                kwargs.get('update_fields') is None):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.DERIVED_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
 
 class Review(models.Model):
     """
@@ -123,6 +187,11 @@ class Review(models.Model):
                 name='unique_title_author'
             ),
         ]
+        indexes = (
+            models.Index(
+                fields=('title', 'pub_date'),
+                name='review_title_pub_date_idx'),
+        )
         ordering = ('pub_date',)
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
@@ -130,6 +199,24 @@ class Review(models.Model):
     def __str__(self):
         return self.text[:MAX_LEN_TEXT]
 
+    def save(self, *args, **kwargs):
+        # Отзыв и агрегаты произведения (см. reviews.signals)
+        # сохраняются в одной транзакции. Прежняя оценка читается в ней
+        # же: загруженная с объектом могла устареть после параллельной
+        # правки, и агрегаты сдвинулись бы на неверную разницу.
+        update_fields = kwargs.get('update_fields')
+        with transaction.atomic():
+            self._previous_score = None
+            if not self._state.adding and self.pk is not None and (
+                    update_fields is None or 'score' in update_fields):
+                self._previous_score = (
+                    Review.objects.select_for_update()
+                    .filter(pk=self.pk)
+                    .values_list('score', flat=True)
+                    .first()
+                )
+            super().save(*args, **kwargs)
+
 
 class Comment(models.Model):
     """Модель комментариев к отзывам."""
@@ -152,6 +239,11 @@ class Comment(models.Model):
     )
 
     class Meta:
+        indexes = (
+            models.Index(
+                fields=('review', 'pub_date'),
+                name='comment_review_pub_date_idx'),
+        )
         ordering = ('pub_date',)
         verbose_name = 'Комментарий'
 
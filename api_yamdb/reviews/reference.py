@@ -0,0 +1,156 @@
+"""
+Справочники категорий и жанров в памяти процесса.
+
+Таблицы категорий и жанров маленькие и меняются редко, поэтому
+процесс держит их целиком и находит объекты по слагу, id и биту маски
+жанров без запросов к БД. Как и в reviews.autocomplete, номер поколения
+хранится в кеше Django: сигналы моделей увеличивают его после коммита,
+и каждый процесс перечитывает справочники при следующем обращении.
+
+С кешем процесса (LocMemCache) поколение других процессов не меняется,
+поэтому справочники перечитываются ещё и при промахе: если слага или id
+нет в снимке, а в маске жанров есть незнакомые биты. Переименования
+и удаления промахов не дают, их снимок видит не позже чем через
+REFERENCE_MAX_AGE секунд.
+"""
+import threading
+import time
+from collections import defaultdict
+
+from django.core.cache import cache
+
+from reviews.models import Category, Genre
+
+GENERATION_KEY = 'reference:generation'
+REFERENCE_MAX_AGE = 60
+
+
+def by_name(obj):
+    return obj.name, obj.pk
+
+
+class Reference:
+    """Объекты одной модели по слагу и id."""
+
+    def __init__(self, objects):
+        self.objects = sorted(objects, key=by_name)
+        self.by_id = {obj.pk: obj for obj in self.objects}
+        self.by_slug = {obj.slug: obj for obj in self.objects}
+        self.by_lower_slug = defaultdict(list)
+        for obj in self.objects:
+            self.by_lower_slug[obj.slug.lower()].append(obj)
+
+
+class References:
+    """Снимок справочников одного поколения."""
+
+    def __init__(self, models):
+        self.references = {
+            model: Reference(model.objects.order_by()) for model in models
+        }
+        self.has_bitless_genres = any(
+            genre.bit is None for genre in self.references[Genre].objects)
+        self.genre_bits = 0
+        for genre in self.references[Genre].objects:
+            self.genre_bits |= genre.mask
+        self.loaded = time.monotonic()
+
+    def knows(self, category_ids=(), genre_mask=0):
+        """Есть ли в снимке категории category_ids и все биты маски."""
+        by_id = self.references[Category].by_id
+        return not genre_mask & ~self.genre_bits and all(
+            pk in by_id for pk in category_ids if pk is not None)
+
+    def get_by_slug(self, model, slug):
+        return self.references[model].by_slug.get(slug)
+
+    def filter_by_slug(self, model, slug):
+        """Объекты со слагом slug без учёта регистра (как iexact)."""
+        return self.references[model].by_lower_slug.get(slug.lower(), [])
+
+    def get_by_id(self, model, obj_id):
+        return self.references[model].by_id.get(obj_id)
+
+    def genres_by_mask(self, mask):
+        """
+        Жанры с битами из маски в порядке названий. Второй элемент
+        результата - есть ли жанры без бита, которых в маске нет.
+        """
+        return (
+            [
+                genre for genre in self.references[Genre].objects
+                if genre.mask & mask
+            ],
+            self.has_bitless_genres,
+        )
+
+
+class ReferenceCache:
+    """
+    Справочники процесса. Поколение проверяется при каждом вызове
+    snapshot(), поэтому при сериализации многих объектов снимок берут
+    один раз на запрос, передав ему id категорий и маску жанров
+    показываемых объектов.
+    """
+
+    models = (Category, Genre)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._references = None
+        self._generation = None
+
+    def snapshot(self, category_ids=(), genre_mask=0):
+        """
+        Текущий снимок. Справочники перечитываются, если сменилось
+        поколение, снимок старше REFERENCE_MAX_AGE или в нём нет
+        категорий category_ids либо битов маски genre_mask.
+        """
+        with self._lock:
+            generation = cache.get_or_set(GENERATION_KEY, 1, None)
+            references = self._references
+            if references is None or generation != self._generation or (
+                    time.monotonic() - references.loaded
+                    > REFERENCE_MAX_AGE) or not references.knows(
+                    category_ids, genre_mask):
+                self._references = References(self.models)
+                self._generation = generation
+            return self._references
+
+    def reload(self, previous):
+        """
+        Перечитывает справочники после промаха в снимке previous. Если
+        другой поток уже заменил снимок, возвращает его без запросов.
+        """
+        with self._lock:
+            if self._references is previous:
+                self._references = References(self.models)
+            return self._references
+
+    def _lookup(self, method, *args):
+        references = self.snapshot()
+        found = getattr(references, method)(*args)
+        if not found:
+            found = getattr(self.reload(references), method)(*args)
+        return found
+
+    def get_by_slug(self, model, slug):
+        return self._lookup('get_by_slug', model, slug)
+
+    def filter_by_slug(self, model, slug):
+        return self._lookup('filter_by_slug', model, slug)
+
+    def get_by_id(self, model, obj_id):
+        return self._lookup('get_by_id', model, obj_id)
+
+    def invalidate(self):
+        """Сбрасывает справочники во всех процессах."""
+        with self._lock:
+            self._references = None
+            try:
+                cache.incr(GENERATION_KEY)
+            except ValueError:
+                cache.set(GENERATION_KEY, 1, None)
+
+
+reference = ReferenceCache()
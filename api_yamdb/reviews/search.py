@@ -0,0 +1,69 @@
+"""
+Полнотекстовый поиск по названиям и описаниям произведений.
+
+В SQLite поиск идёт по виртуальной таблице FTS5 ``reviews_title_search``,
+которую создаёт миграция 0008 и синхронизируют триггеры на
+``reviews_title``. На других СУБД используется поиск через icontains.
+
+Миграции, меняющие ``reviews_title``, в SQLite пересоздают таблицу
+и теряют её триггеры, поэтому такие миграции восстанавливают их сами,
+как 0009.
+"""
+import re
+from functools import lru_cache
+
+from django.db import connection
+from django.db.models import FloatField, Q
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'reviews_title_search'
+NAME_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+
+@lru_cache(maxsize=None)
+def fts_available():
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        return FTS_TABLE in connection.introspection.table_names(cursor)
+
+
+def build_match_query(value):
+    """
+    Превращает пользовательский ввод в выражение MATCH: слова берутся
+    в кавычки, чтобы операторы FTS5 во вводе не ломали запрос.
+    Последнее слово ищется по префиксу.
+    """
+    words = re.findall(r'\w+', value)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def search_titles(queryset, value):
+    """Фильтрует произведения по запросу и сортирует по релевантности."""
+    if not fts_available():
+        return queryset.filter(
+            Q(name__icontains=value) | Q(description__icontains=value))
+    match = build_match_query(value)
+    if match is None:
+        return queryset.none()
+    rank = RawSQL(
+        f'SELECT bm25({FTS_TABLE}, %s, %s) FROM {FTS_TABLE} '
+        f'WHERE {FTS_TABLE} MATCH %s AND rowid = reviews_title.id',
+        (NAME_WEIGHT, DESCRIPTION_WEIGHT, match),
+        output_field=FloatField(),
+    )
+    matched_ids = RawSQL(
+        f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+        (match,),
+    )
+    return (
+        queryset
+        .filter(pk__in=matched_ids)
+        .annotate(search_rank=rank)
+        .order_by('search_rank', 'name', 'pk')
+    )
@@ -0,0 +1,105 @@
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_migrate, post_save, pre_delete)
+from django.dispatch import receiver
+
+from reviews.autocomplete import autocomplete
+from reviews.models import Category, Genre, Review, Title
+from reviews.reference import reference
+from reviews.utils import (
+    bulk_changed, clear_genre_bits, genres_mask, set_genre_bits,
+    update_title_rating)
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, **kwargs):
+    if created:
+        update_title_rating(
+            instance.title_id, score_delta=instance.score, count_delta=1)
+        return
+    # Прежнюю оценку Review.save читает в транзакции записи.
+    previous_score = getattr(instance, '_previous_score', None)
+    if previous_score is not None and instance.score != previous_score:
+        update_title_rating(
+            instance.title_id, score_delta=instance.score - previous_score)
+
+
+@receiver(pre_delete, sender=Review)
+def review_pre_delete(sender, instance, **kwargs):
+    # Удаление идёт в транзакции коллектора: оценка читается в ней,
+    # а не берётся из загруженного, возможно устаревшего, объекта.
+    instance._previous_score = sender.objects.filter(
+        pk=instance.pk).values_list('score', flat=True).first()
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    score = getattr(instance, '_previous_score', None)
+    if score is None:
+        score = instance.score
+    update_title_rating(
+        instance.title_id, score_delta=-score, count_delta=-1)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_changed(sender, instance, action, reverse, pk_set,
+                         **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        titles = Title.objects.all()
+        if action != 'post_clear':
+            titles = titles.filter(pk__in=pk_set)
+        mask = instance.mask
+    else:
+        titles = Title.objects.filter(pk=instance.pk)
+        if action == 'post_clear':
+            titles.update(genre_mask=0)
+            return
+        mask = genres_mask(pk_set)
+    if not mask:
+        return
+    if action == 'post_add':
+        set_genre_bits(titles, mask)
+    else:
+        clear_genre_bits(titles, mask)
+
+
+@receiver(pre_delete, sender=Genre)
+def genre_deleted(sender, instance, **kwargs):
+    # Связи с жанром удаляются без сигнала m2m_changed.
+    if instance.mask:
+        clear_genre_bits(Title.objects.all(), instance.mask)
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Category)
+def autocomplete_saved(sender, instance, **kwargs):
+    transaction.on_commit(lambda: autocomplete.update(instance))
+
+
+@receiver(post_delete, sender=Title)
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Category)
+def autocomplete_deleted(sender, instance, **kwargs):
+    transaction.on_commit(lambda: autocomplete.remove(instance))
+
+
+@receiver(bulk_changed, sender=Title)
+def autocomplete_bulk_changed(sender, **kwargs):
+    transaction.on_commit(autocomplete.invalidate)
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Category)
+def reference_changed(sender, **kwargs):
+    transaction.on_commit(reference.invalidate)
+
+
+@receiver(post_migrate)
+def reference_reset(sender, **kwargs):
+    # migrate и flush меняют таблицы без сигналов моделей.
+    reference.invalidate()
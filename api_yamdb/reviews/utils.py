@@ -0,0 +1,280 @@
+from collections import defaultdict
+
+from django.db import NotSupportedError, connections, router, transaction
+from django.db.models import (
+    BigIntegerField, Count, ExpressionWrapper, F, IntegerField, OuterRef, Q,
+    Subquery, Sum, Value)
+from django.db.models.functions import Coalesce, NullIf
+
+from django.dispatch import Signal
+
+from reviews.models import Comment, Genre, Review, Title
+from reviews.reference import reference
+
+GENRE_MODE_ALL = 'all'
+GENRE_MODE_ANY = 'any'
+
+# bulk_create и update() не отправляют сигналов моделей, поэтому
+# массовые операции сообщают о своих изменениях этим сигналом:
+# sender - модель, objects - созданные или изменённые объекты,
+# title_ids - произведения, чьи отзывы изменены без загрузки объектов.
+bulk_changed = Signal()
+
+
+def update_title_rating(title_id, score_delta=0, count_delta=0):
+    """
+    Атомарно сдвигает сумму оценок и число отзывов произведения.
+
+    Рейтинг пересчитывается тем же UPDATE: в правой части SET
+    используются значения строки до обновления, поэтому дельты
+    прибавляются и к числителю, и к знаменателю.
+    """
+    new_sum = F('score_sum') + score_delta
+    new_count = F('review_count') + count_delta
+    Title.objects.filter(pk=title_id).update(
+        score_sum=new_sum,
+        review_count=new_count,
+        rating=new_sum / NullIf(new_count, 0),
+    )
+
+
+def recalculate_ratings(queryset=None):
+    """Пересчитывает агрегаты оценок с нуля по таблице отзывов."""
+    if queryset is None:
+        queryset = Title.objects.all()
+    reviews = (
+        Review.objects.filter(title=OuterRef('pk'))
+        .order_by()
+        .values('title')
+    )
+    score_sum = reviews.annotate(total=Sum('score')).values('total')
+    review_count = reviews.annotate(total=Count('pk')).values('total')
+    queryset.update(
+        score_sum=Coalesce(
+            Subquery(score_sum, output_field=IntegerField()), 0),
+        review_count=Coalesce(
+            Subquery(review_count, output_field=IntegerField()), 0),
+    )
+    updated = queryset.update(
+        rating=F('score_sum') / NullIf(F('review_count'), 0)
+    )
+    bulk_changed.send(sender=Title, objects=())
+    return updated
+
+
+def genres_mask(genre_ids):
+    """
+    Маска жанров с указанными id. Биты берутся из справочника
+    процесса, запрос к БД нужен, только если жанра в нём нет.
+    """
+    references = reference.snapshot()
+    genres = [references.get_by_id(Genre, pk) for pk in genre_ids]
+    if None not in genres:
+        return sum(genre.mask for genre in genres)
+    return sum(
+        1 << bit for bit in Genre.objects.filter(
+            pk__in=genre_ids).exclude(bit=None).values_list('bit', flat=True)
+    )
+
+
+def filter_by_genre_mask(queryset, mask, mode=GENRE_MODE_ALL):
+    """
+    Оставляет произведения, у которых в маске жанров есть все
+    (mode='all') или хотя бы один (mode='any') бит из mask.
+    """
+    queryset = queryset.alias(genre_match=F('genre_mask').bitand(mask))
+    if mode == GENRE_MODE_ALL:
+        return queryset.filter(genre_match=mask)
+    return queryset.exclude(genre_match=0)
+
+
+def filter_by_genres(queryset, genres, mode=GENRE_MODE_ALL):
+    """
+    Фильтрует произведения по жанрам без соединения с таблицей связей.
+    Жанры без бита в маске (сверх MAX_GENRE_BITS) проверяются через
+    подзапрос к таблице связей.
+    """
+    mask = sum(genre.mask for genre in genres)
+    unmasked = [genre.pk for genre in genres if genre.bit is None]
+    links = Title.genre.through.objects.values('title_id')
+    if mode == GENRE_MODE_ALL:
+        if mask:
+            queryset = filter_by_genre_mask(queryset, mask, mode)
+        for genre_id in unmasked:
+            queryset = queryset.filter(pk__in=links.filter(genre_id=genre_id))
+        return queryset
+    condition = Q(pk__in=links.filter(genre_id__in=unmasked)) if (
+        unmasked) else Q(pk__in=())
+    if mask:
+        queryset = queryset.alias(genre_match=F('genre_mask').bitand(mask))
+        condition |= ~Q(genre_match=0)
+    return queryset.filter(condition)
+
+
+def set_genre_bits(queryset, mask):
+    return queryset.update(genre_mask=F('genre_mask').bitor(mask))
+
+
+def clear_genre_bits(queryset, mask):
+    return filter_by_genre_mask(queryset, mask, GENRE_MODE_ANY).update(
+        genre_mask=F('genre_mask').bitand(~mask))
+
+
+def recalculate_genre_masks(queryset=None):
+    """
+    Пересчитывает маски жанров произведений по таблице связей одним
+    UPDATE: маска - сумма 1 << bit жанров произведения, у которых есть
+    бит (биты жанров различны, поэтому сумма совпадает с OR).
+    """
+    if queryset is None:
+        queryset = Title.objects.all()
+    masks = (
+        Title.genre.through.objects
+        .filter(title=OuterRef('pk'), genre__bit__isnull=False)
+        .order_by()
+        .values('title')
+        .annotate(mask=Sum(ExpressionWrapper(
+            Value(1).bitleftshift(F('genre__bit')),
+            output_field=BigIntegerField())))
+        .values('mask')
+    )
+    updated = queryset.update(genre_mask=Coalesce(
+        Subquery(masks, output_field=BigIntegerField()), 0))
+    bulk_changed.send(sender=Title, objects=())
+    return updated
+
+
+def bulk_insert(model, objs):
+    """
+    bulk_create с заполнением первичных ключей.
+
+    Если БД вернула ключи сама, они и используются. Иначе (SQLite
+    в Django 3.2) ключами считаются последние len(objs) id таблицы:
+    INSERT и чтение id идут в одной транзакции, а блокировка записи
+    SQLite до её конца не даёт другим соединениям добавить строки.
+    На других СУБД такой гарантии нет, поэтому без возвращённых
+    ключей там возбуждается NotSupportedError.
+    """
+    db = router.db_for_write(model)
+    with transaction.atomic(using=db):
+        objs = model.objects.using(db).bulk_create(objs)
+        if not objs or objs[0].pk is not None:
+            return objs
+        if connections[db].vendor != 'sqlite':
+            raise NotSupportedError(
+                'bulk_insert восстанавливает первичные ключи только '
+                'в SQLite.')
+        pks = model.objects.using(db).order_by('-pk').values_list(
+            'pk', flat=True)[:len(objs)]
+        for obj, pk in zip(objs, reversed(pks)):
+            obj.pk = pk
+    return objs
+
+
+def bulk_create_titles(items):
+    """
+    Создаёт произведения из проверенных данных сериализатора (жанры
+    и категория - объекты) несколькими INSERT в одной транзакции.
+    Маска жанров считается сразу, связанные жанры кладутся в кеш
+    prefetch_related, чтобы их вывод не требовал запросов.
+    """
+    links = Title.genre.through
+    with transaction.atomic():
+        titles = bulk_insert(Title, [
+            Title(
+                genre_mask=sum({genre.mask for genre in item['genre']}),
+                **{
+                    name: value for name, value in item.items()
+                    if name != 'genre'
+                }
+            )
+            for item in items
+        ])
+        links.objects.bulk_create([
+            links(title_id=title.pk, genre_id=genre.pk)
+            for title, item in zip(titles, items)
+            for genre in dict.fromkeys(item['genre'])
+        ])
+        bulk_changed.send(sender=Title, objects=titles)
+    for title, item in zip(titles, items):
+        genres = title.genre.get_queryset()
+        genres._result_cache = list(dict.fromkeys(item['genre']))
+        genres._prefetch_done = True
+        title._prefetched_objects_cache = {'genre': genres}
+    return titles
+
+
+def bulk_create_reviews(reviews):
+    """
+    Создаёт отзывы (несохранённые объекты Review) через bulk_create
+    и сдвигает агрегаты каждого произведения одним UPDATE.
+    """
+    deltas = defaultdict(lambda: [0, 0])
+    with transaction.atomic():
+        reviews = bulk_insert(Review, reviews)
+        for review in reviews:
+            deltas[review.title_id][0] += review.score
+            deltas[review.title_id][1] += 1
+        for title_id, (score_delta, count_delta) in deltas.items():
+            update_title_rating(title_id, score_delta, count_delta)
+        bulk_changed.send(sender=Review, objects=reviews)
+    return reviews
+
+
+def subtract_reviews_from_ratings(reviews):
+    """
+    Вычитает оценки отзывов из выборки reviews из агрегатов их
+    произведений одним UPDATE с подзапросами.
+    """
+    per_title = reviews.filter(title=OuterRef('pk')).order_by().values(
+        'title')
+    score_sum = Coalesce(Subquery(
+        per_title.annotate(total=Sum('score')).values('total'),
+        output_field=IntegerField()), 0)
+    review_count = Coalesce(Subquery(
+        per_title.annotate(total=Count('pk')).values('total'),
+        output_field=IntegerField()), 0)
+    new_sum = F('score_sum') - score_sum
+    new_count = F('review_count') - review_count
+    Title.objects.filter(pk__in=reviews.values('title_id')).update(
+        score_sum=new_sum,
+        review_count=new_count,
+        rating=new_sum / NullIf(new_count, 0),
+    )
+
+
+def cascade_delete(obj):
+    """
+    Удаляет произведение, отзыв или пользователя.
+
+    Стандартный коллектор Django загружает в память все зависимые
+    отзывы и комментарии, потому что на них подписаны сигналы. Здесь
+    они удаляются DELETE-запросами по условию в порядке зависимостей
+    (комментарии, отзывы), а сам объект - обычным delete(), так что
+    его сигналы срабатывают. Агрегаты произведений при удалении
+    пользователя вычитаются одним UPDATE до удаления его отзывов.
+    """
+    title_ids = ()
+    if isinstance(obj, Title):
+        reviews = Review.objects.filter(title=obj)
+        comments = Comment.objects.filter(review__title=obj)
+    elif isinstance(obj, Review):
+        reviews = Review.objects.none()
+        comments = Comment.objects.filter(review=obj)
+    else:
+        reviews = Review.objects.filter(author=obj)
+        comments = Comment.objects.filter(
+            Q(author=obj) | Q(review__author=obj))
+    with transaction.atomic():
+        if not isinstance(obj, (Title, Review)):
+            title_ids = list(
+                reviews.order_by().values_list('title_id', flat=True)
+                .distinct())
+            subtract_reviews_from_ratings(reviews)
+        # _raw_delete выполняет один DELETE без коллектора и сигналов.
+        comments._raw_delete(comments.db)
+        if not isinstance(obj, Review):
+            reviews._raw_delete(reviews.db)
+        bulk_changed.send(sender=Comment, objects=())
+        bulk_changed.send(sender=Review, objects=(), title_ids=title_ids)
+        obj.delete()
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from users.models import MyUser
+from users.models import MyUser, OutboxEmail
 
 
 @admin.register(MyUser)
@@ -9,3 +9,9 @@ class MyUserAdmin(admin.ModelAdmin):
         'username', 'email', 'first_name', 'last_name', 'bio', 'role')
     search_fields = (
         'username', 'email', 'first_name', 'last_name', 'role')
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ('to', 'subject', 'created', 'attempts', 'next_attempt')
+    search_fields = ('to',)
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from users.outbox import deliver_outbox
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди OutboxEmail.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Не завершаться, а проверять очередь каждые --interval '
+                 'секунд.')
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Пауза между проверками пустой очереди в режиме --loop.')
+        parser.add_argument(
+            '--batch-size', type=int, default=None,
+            help='Сколько писем отправлять через одно соединение.')
+
+    def handle(self, *args, **options):
+        while True:
+            sent = failed = 0
+            while True:
+                batch_sent, batch_failed = deliver_outbox(
+                    options['batch_size'])
+                sent += batch_sent
+                failed += batch_failed
+                if not batch_sent and not batch_failed:
+                    break
+            if sent or failed or not options['loop']:
+                self.stdout.write(
+                    f'Отправлено писем: {sent}, не отправлено: {failed}.')
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
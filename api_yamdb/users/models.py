@@ -1,6 +1,7 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.core.validators import RegexValidator
+from django.utils import timezone
 
 from users.constants import MAX_LEN_EMAIL, MAX_LEN_ROLE, MAX_LEN_USERNAME
 
@@ -12,6 +13,11 @@ ROLES = ((USER, 'Аутентифицированный пользователь
          (MODERATOR, 'Модератор'),
          (ADMIN, 'Администратор'))
 
+username_validator = RegexValidator(
+    regex=r'^[\w.@+-]+$',
+    message='Недопустимый символ в имени пользователя'
+)
+
 
 class MyUser(AbstractUser):
     """Модель прользователей"""
@@ -19,10 +25,7 @@ class MyUser(AbstractUser):
         max_length=MAX_LEN_USERNAME,
         unique=True,
         null=False,
-        validators=[RegexValidator(
-            regex=r'^[\w.@+-]+$',
-            message='Недопустимый символ в имени пользователя'
-        )])
+        validators=[username_validator])
     email = models.EmailField(
         max_length=MAX_LEN_EMAIL,
         unique=True,
@@ -55,3 +58,27 @@ class MyUser(AbstractUser):
 
     class Meta:
         ordering = ('pk',)
+
+
+class OutboxEmail(models.Model):
+    """
+    Письмо в очереди на отправку. Отправленные письма удаляются,
+    у исчерпавших попытки next_attempt пуст.
+    """
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=MAX_LEN_EMAIL)
+    to = models.EmailField(max_length=MAX_LEN_EMAIL)
+    created = models.DateTimeField(auto_now_add=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt = models.DateTimeField(
+        default=timezone.now, null=True, db_index=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        verbose_name = 'Письмо в очереди'
+        verbose_name_plural = 'Очередь писем'
+        ordering = ('pk',)
+
+    def __str__(self):
+        return f'{self.to}: {self.subject}'
@@ -0,0 +1,121 @@
+"""
+Очередь исходящих писем.
+
+Запрос к API только сохраняет письмо в таблицу OutboxEmail и не ждёт
+почтового сервера. Письма отправляет команда ``send_queued_emails``:
+она забирает пачку готовых к отправке писем и отправляет их через одно
+соединение с почтовым бэкендом. Неотправленное письмо получает новую
+попытку с экспоненциальной задержкой, пока не исчерпает MAX_ATTEMPTS.
+
+С ``EMAIL_OUTBOX['EAGER']`` очередь разбирается сразу после коммита
+транзакции, в которой письмо поставлено, - так удобно в тестах
+и при разработке с console-бэкендом.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from users.models import OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'EAGER': False,
+    'BATCH_SIZE': 100,
+    'MAX_ATTEMPTS': 5,
+    # Секунды: задержка перед второй попыткой, дальше она удваивается.
+    'RETRY_DELAY': 60,
+    'MAX_RETRY_DELAY': 60 * 60,
+    # Секунды, на которые отправитель забирает пачку; если он упал,
+    # письма снова станут доступны по истечении этого времени.
+    'LEASE': 5 * 60,
+}
+
+
+def get_setting(name):
+    return getattr(settings, 'EMAIL_OUTBOX', {}).get(name, DEFAULTS[name])
+
+
+def retry_delay(attempts):
+    """Задержка перед следующей попыткой после attempts неудачных."""
+    return timedelta(seconds=min(
+        get_setting('RETRY_DELAY') * 2 ** (attempts - 1),
+        get_setting('MAX_RETRY_DELAY')))
+
+
+def enqueue_email(subject, body, to, from_email=None):
+    """Ставит письмо в очередь на отправку."""
+    email = OutboxEmail.objects.create(
+        subject=subject, body=body, to=to,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL)
+    if get_setting('EAGER'):
+        transaction.on_commit(deliver_outbox)
+    return email
+
+
+def claim_batch(now, batch_size):
+    """
+    Забирает до batch_size готовых писем: переносит их следующую
+    попытку на время аренды, чтобы другой отправитель их не взял.
+    """
+    lease_until = now + timedelta(seconds=get_setting('LEASE'))
+    pks = list(
+        OutboxEmail.objects.filter(next_attempt__lte=now)
+        .order_by('next_attempt', 'pk')
+        .values_list('pk', flat=True)[:batch_size])
+    if not pks:
+        return []
+    OutboxEmail.objects.filter(pk__in=pks, next_attempt__lte=now).update(
+        next_attempt=lease_until)
+    return list(OutboxEmail.objects.filter(
+        pk__in=pks, next_attempt=lease_until))
+
+
+def deliver_outbox(batch_size=None):
+    """
+    Отправляет одну пачку писем через общее соединение с бэкендом.
+    Возвращает число отправленных и неотправленных писем.
+    """
+    now = timezone.now()
+    emails = claim_batch(now, batch_size or get_setting('BATCH_SIZE'))
+    if not emails:
+        return 0, 0
+    sent, failed = [], []
+    connection = get_connection()
+    try:
+        connection.open()
+        for email in emails:
+            try:
+                EmailMessage(
+                    subject=email.subject, body=email.body,
+                    from_email=email.from_email, to=[email.to],
+                    connection=connection,
+                ).send()
+            except Exception as error:
+                failed.append((email, error))
+            else:
+                sent.append(email.pk)
+    except Exception as error:
+        done = {*sent, *(email.pk for email, _ in failed)}
+        failed += [(email, error) for email in emails if email.pk not in done]
+    finally:
+        try:
+            connection.close()
+        except Exception:
+            logger.exception('Не удалось закрыть почтовое соединение')
+    OutboxEmail.objects.filter(pk__in=sent).delete()
+    for email, error in failed:
+        email.attempts += 1
+        email.last_error = repr(error)
+        email.next_attempt = (
+            now + retry_delay(email.attempts)
+            if email.attempts < get_setting('MAX_ATTEMPTS') else None)
+        email.save(update_fields=('attempts', 'last_error', 'next_attempt'))
+        logger.warning(
+            'Письмо %s для %s не отправлено (попытка %s): %r',
+            email.pk, email.to, email.attempts, error)
+    return len(sent), len(failed)
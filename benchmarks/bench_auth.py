@@ -0,0 +1,56 @@
+"""
+Накладные расходы аутентификации на запрос с одним и тем же токеном:
+JWTAuthentication из simplejwt против CachedJWTAuthentication.
+"""
+from benchmarks.common import measure, report, setup_django
+
+REQUESTS = 1000
+
+
+def main():
+    setup_django()
+    from django.conf import settings
+    from rest_framework.test import APIRequestFactory
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from api.authentication import (
+        CachedJWTAuthentication, access_token_for_user)
+    from users.models import MyUser
+
+    # Бенчмарк идёт в одном процессе, локальный кеш для него общий.
+    settings.AUTH_CACHE_SHARED = True
+    user = MyUser.objects.create(
+        username='reader', email='reader@yamdb.fake', role='admin')
+    factory = APIRequestFactory()
+    plain_token = str(AccessToken.for_user(user))
+    claims_token = str(access_token_for_user(user))
+    plain, cached = JWTAuthentication(), CachedJWTAuthentication()
+
+    def authenticate(backend, token):
+        request = factory.get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        for _ in range(REQUESTS):
+            backend.authenticate(request)
+
+    def validate(backend, token):
+        raw_token = token.encode()
+        for _ in range(REQUESTS):
+            backend.get_validated_token(raw_token)
+
+    authenticate(cached, claims_token)
+    report(f'Аутентификация {REQUESTS} запросов с одним токеном:', (
+        (
+            'Проверка токена',
+            measure(lambda: validate(plain, plain_token)),
+            measure(lambda: validate(cached, claims_token)),
+        ),
+        (
+            'Токен и пользователь',
+            measure(lambda: authenticate(plain, plain_token)),
+            measure(lambda: authenticate(cached, claims_token)),
+        ),
+    ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""Рендеринг и разбор JSON на 1000 строк: JSONRenderer против FastJSON."""
+from io import BytesIO
+
+from benchmarks.bench_serialization import ROWS, create_data
+from benchmarks.common import measure, report, setup_django
+
+
+def main():
+    setup_django()
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+
+    from api.parsers import FastJSONParser
+    from api.renderers import FastJSONRenderer, orjson
+    from api.serializers import ReviewSerializer, TitleReadSerializer
+    from reviews.models import Title
+
+    if orjson is None:
+        print('orjson не установлен, FastJSONRenderer использует json.')
+    title, _ = create_data()
+    cases = (
+        ('Страница произведений', TitleReadSerializer,
+         Title.objects.all()),
+        ('Страница отзывов', ReviewSerializer, title.reviews.all()),
+    )
+    slow_renderer, fast_renderer = JSONRenderer(), FastJSONRenderer()
+    slow_parser, fast_parser = JSONParser(), FastJSONParser()
+    rows = []
+    for name, serializer_class, queryset in cases:
+        reader = serializer_class.values_reader
+        data = {
+            'count': ROWS, 'next': None, 'previous': None,
+            'results': reader.to_representation(
+                reader.get_queryset(queryset)[:ROWS]),
+        }
+        content = slow_renderer.render(data)
+        assert fast_renderer.render(data) == content, name
+        rows.append((
+            f'{name}: рендеринг',
+            measure(lambda: slow_renderer.render(data)),
+            measure(lambda: fast_renderer.render(data)),
+        ))
+
+        def parse(parser):
+            return parser.parse(BytesIO(content))
+
+        assert parse(fast_parser) == parse(slow_parser), name
+        rows.append((
+            f'{name}: разбор',
+            measure(lambda: parse(slow_parser)),
+            measure(lambda: parse(fast_parser)),
+        ))
+    report(f'JSON для {ROWS} строк:', rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""Сериализация 1000 строк: ModelSerializer против values_reader."""
+from benchmarks.common import measure, report, setup_django
+
+ROWS = 1000
+
+
+def create_data():
+    from django.utils import timezone
+
+    from reviews.models import Category, Comment, Genre, Review, Title
+    from users.models import MyUser
+
+    category = Category.objects.create(name='Фильм', slug='films')
+    genres = [
+        Genre.objects.create(name=f'Жанр {idx}', slug=f'genre-{idx}')
+        for idx in range(3)
+    ]
+    Title.objects.bulk_create(
+        Title(name=f'Произведение {idx}', year=2000, category=category,
+              description='Описание')
+        for idx in range(ROWS)
+    )
+    links = Title.genre.through
+    links.objects.bulk_create(
+        links(title_id=title_id, genre_id=genre.pk)
+        for title_id in Title.objects.values_list('pk', flat=True)
+        for genre in genres[:2]
+    )
+    MyUser.objects.bulk_create(
+        MyUser(username=f'user{idx}', email=f'user{idx}@yamdb.fake')
+        for idx in range(ROWS)
+    )
+    title = Title.objects.first()
+    Review.objects.bulk_create(
+        Review(title=title, author_id=author_id, text='Отзыв', score=5,
+               pub_date=timezone.now())
+        for author_id in MyUser.objects.values_list('pk', flat=True)
+    )
+    review = Review.objects.first()
+    Comment.objects.bulk_create(
+        Comment(review=review, author_id=author_id, text='Комментарий',
+                pub_date=timezone.now())
+        for author_id in MyUser.objects.values_list('pk', flat=True)
+    )
+    return title, review
+
+
+def main():
+    setup_django()
+    from rest_framework.renderers import JSONRenderer
+
+    from api.serializers import (
+        CommentSerializer, ReviewSerializer, TitleReadSerializer)
+    from reviews.models import Title
+
+    title, review = create_data()
+    cases = (
+        ('TitleReadSerializer', TitleReadSerializer, Title.objects.all()),
+        ('ReviewSerializer', ReviewSerializer,
+         title.reviews.select_related('author')),
+        ('CommentSerializer', CommentSerializer,
+         review.comments.select_related('author')),
+    )
+    rows = []
+    renderer = JSONRenderer()
+    for name, serializer_class, queryset in cases:
+        reader = serializer_class.values_reader
+
+        def slow():
+            return serializer_class(queryset.all()[:ROWS], many=True).data
+
+        def fast():
+            return reader.to_representation(
+                reader.get_queryset(queryset.all())[:ROWS])
+
+        assert renderer.render(slow()) == renderer.render(fast()), name
+        rows.append((name, measure(slow), measure(fast)))
+    report(f'Сериализация {ROWS} строк (с запросами к БД):', rows)
+
+
+if __name__ == '__main__':
+    main()
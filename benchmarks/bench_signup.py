@@ -0,0 +1,85 @@
+"""
+Регистрация под нагрузкой: сколько регистраций в секунду выдерживает
+SignUpView при нескольких параллельных клиентах, и сколько запросов
+к БД занимают регистрация и получение токена.
+"""
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+
+from benchmarks.common import setup_django
+
+SIGNUPS = 400
+WORKERS = (1, 4, 8)
+
+
+def main():
+    database = os.path.join(tempfile.mkdtemp(), 'bench.sqlite3')
+    setup_django(database)
+    from django.conf import settings
+    from django.contrib.auth.tokens import default_token_generator
+    from django.db import connection
+    from django.test import Client, override_settings
+    from django.test.utils import CaptureQueriesContext
+
+    from users.models import MyUser
+
+    settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+    settings.EMAIL_OUTBOX = {**settings.EMAIL_OUTBOX, 'EAGER': False}
+    # Все клиенты бенчмарка приходят с одного адреса.
+    override_settings(REST_FRAMEWORK={
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {
+            **settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'],
+            'anon': None, 'signup': None, 'token': None,
+        },
+    }).enable()
+    numbers = count()
+
+    def signup(client):
+        number = next(numbers)
+        return client.post('/api/v1/auth/signup/', data={
+            'username': f'reader{number}',
+            'email': f'reader{number}@yamdb.fake',
+        }).status_code
+
+    def run(requests):
+        client = Client()
+        try:
+            return [signup(client) for _ in range(requests)]
+        finally:
+            connection.close()
+
+    print(f'Регистрация {SIGNUPS} пользователей:')
+    for workers in WORKERS:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(workers) as executor:
+            statuses = [
+                status
+                for result in executor.map(
+                    run, [SIGNUPS // workers] * workers)
+                for status in result
+            ]
+        elapsed = time.perf_counter() - start
+        failed = sum(status != 200 for status in statuses)
+        print(
+            f'  потоков: {workers:<2} {len(statuses) / elapsed:8.0f} '
+            f'регистраций/с, ошибок: {failed}')
+
+    client = Client()
+    with CaptureQueriesContext(connection) as context:
+        signup(client)
+    print(f'Запросов к БД на регистрацию: {len(context.captured_queries)}')
+    user = MyUser.objects.order_by('-pk').first()
+    with CaptureQueriesContext(connection) as context:
+        client.post('/api/v1/auth/token/', data={
+            'username': user.username,
+            'confirmation_code': default_token_generator.make_token(user),
+        })
+    print(f'Запросов к БД на токен: {len(context.captured_queries)}')
+
+
+if __name__ == '__main__':
+    main()
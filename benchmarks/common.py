@@ -0,0 +1,49 @@
+"""
+Общая подготовка бенчмарков: Django с базой SQLite в памяти.
+
+Запуск из корня репозитория, например:
+    python -m benchmarks.bench_serialization
+"""
+import os
+import sys
+import time
+
+PROJECT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'api_yamdb')
+
+
+def setup_django(database=':memory:'):
+    """
+    Настраивает Django и создаёт таблицы. Многопоточным бенчмаркам
+    нужен файл базы: у каждого потока своё соединение.
+    """
+    sys.path.insert(0, PROJECT_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+    from django.conf import settings
+    settings.DATABASES['default']['NAME'] = database
+    settings.QUERY_BUDGET = {'ENABLED': False}
+
+    import django
+    django.setup()
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+
+
+def measure(func, repeat=5):
+    """Лучшее время выполнения func в миллисекундах."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def report(title, rows):
+    """Печатает таблицу: название, время до и после, ускорение."""
+    print(title)
+    for name, before, after in rows:
+        print(
+            f'  {name:<32} {before:9.2f} ms -> {after:9.2f} ms '
+            f'(x{before / after:.1f})')
@@ -1,6 +1,7 @@
 import os
 import sys
 
+import pytest
 from django.utils.version import get_version
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -33,3 +34,17 @@ assert get_version() < '4.0.0', 'Пожалуйста, используйте в
 pytest_plugins = [
     'tests.fixtures.fixture_user',
 ]
+
+
+@pytest.fixture(autouse=True)
+def eager_email_outbox(settings):
+    # Тесты регистрации ждут письмо сразу после ответа API.
+    settings.EMAIL_OUTBOX = {**settings.EMAIL_OUTBOX, 'EAGER': True}
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # Окна повторной отправки кода и другие ключи не переживают тест.
+    from django.core.cache import cache
+
+    cache.clear()
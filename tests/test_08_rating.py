@@ -0,0 +1,165 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_reviews, create_single_review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    @staticmethod
+    def get_title(title_id):
+        from reviews.models import Title
+        return Title.objects.get(pk=title_id)
+
+    def test_01_rating_follows_review_writes(self, admin_client, admin,
+                                             user_client, user):
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client}
+        )
+        title_id = titles[0]['id']
+        title = self.get_title(title_id)
+        assert (title.score_sum, title.review_count, title.rating) == (
+            5, 1, 5
+        ), (
+            'Проверьте, что при создании отзыва у произведения обновляются '
+            'сумма оценок, число отзывов и рейтинг.'
+        )
+
+        create_single_review(user_client, title_id, 'second', 2)
+        title = self.get_title(title_id)
+        assert (title.score_sum, title.review_count, title.rating) == (
+            7, 2, 3
+        )
+        response = admin_client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.json()['rating'] == 3
+
+        response = admin_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[0]['id']
+            ),
+            data={'score': 10}
+        )
+        assert response.status_code == HTTPStatus.OK
+        title = self.get_title(title_id)
+        assert (title.score_sum, title.review_count, title.rating) == (
+            12, 2, 6
+        ), (
+            'Проверьте, что при изменении оценки в отзыве рейтинг '
+            'произведения пересчитывается.'
+        )
+
+        response = admin_client.delete(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[0]['id']
+            )
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        title = self.get_title(title_id)
+        assert (title.score_sum, title.review_count, title.rating) == (
+            2, 1, 2
+        )
+
+        user.delete()
+        title = self.get_title(title_id)
+        assert (title.score_sum, title.review_count, title.rating) == (
+            0, 0, None
+        ), (
+            'Проверьте, что при каскадном удалении отзывов вместе с автором '
+            'рейтинг произведения пересчитывается.'
+        )
+
+    def test_02_recalculate_ratings_command(self, admin_client, admin,
+                                            user_client, user):
+        from reviews.models import Title
+
+        _, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        Title.objects.update(score_sum=0, review_count=0, rating=None)
+
+        call_command('recalculate_ratings')
+
+        title = self.get_title(titles[0]['id'])
+        assert (title.score_sum, title.review_count, title.rating) == (
+            10, 2, 5
+        )
+        title = self.get_title(titles[1]['id'])
+        assert (title.score_sum, title.review_count, title.rating) == (
+            0, 0, None
+        )
+
+    def test_03_stale_title_save_keeps_aggregates(self, admin_client,
+                                                  user_client):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from reviews.models import Title
+
+        title = Title.objects.create(name='Фильм', year=2000)
+        stale = Title.objects.get(pk=title.pk)
+        create_single_review(user_client, title.pk, 'Отзыв', 8)
+
+        stale.name = 'Новое название'
+        stale.save()
+        title = self.get_title(title.pk)
+        assert title.name == 'Новое название'
+        assert (title.score_sum, title.review_count, title.rating) == (
+            8, 1, 8
+        ), (
+            'Проверьте, что сохранение загруженного ранее произведения '
+            'не перезаписывает агрегаты оценок.'
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.patch(
+                self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title.pk),
+                data={'year': 2001})
+        assert response.status_code == HTTPStatus.OK
+        updates = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('UPDATE "reviews_title" SET "name"')
+        ]
+        assert updates and not any(
+            column in sql for sql in updates
+            for column in ('"score_sum"', '"review_count"', '"rating"',
+                           '"genre_mask"')
+        ), (
+            'Проверьте, что PATCH произведения не записывает агрегаты '
+            'оценок и маску жанров.'
+        )
+
+    def test_04_stale_review_copies(self, user):
+        from reviews.models import Review, Title
+
+        title = Title.objects.create(name='Фильм', year=2000)
+        review = Review.objects.create(
+            title=title, author=user, text='Отзыв', score=5)
+        by_author = Review.objects.get(pk=review.pk)
+        by_moderator = Review.objects.get(pk=review.pk)
+        by_author.score = 7
+        by_author.save()
+        by_moderator.score = 9
+        by_moderator.save()
+        title = self.get_title(title.pk)
+        assert (title.score_sum, title.review_count, title.rating) == (
+            9, 1, 9
+        ), (
+            'Проверьте, что прежняя оценка отзыва читается при записи, '
+            'а не берётся из загруженного ранее объекта.'
+        )
+
+        by_author.delete()
+        title = self.get_title(title.pk)
+        assert (title.score_sum, title.review_count, title.rating) == (
+            0, 0, None
+        )
@@ -0,0 +1,305 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import (
+    check_query_budget, create_comments, create_reviews, create_titles
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09QueryCount:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLES_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    @staticmethod
+    def create_more_titles(count=10):
+        from reviews.models import Category, Genre, Title
+
+        category = Category.objects.get(slug='films')
+        genres = list(Genre.objects.all())
+        for idx in range(count):
+            title = Title.objects.create(
+                name=f'Фильм {idx}', year=2000, category=category
+            )
+            title.genre.set(genres)
+
+    @pytest.mark.parametrize('query, num_queries', (
+        ('', 2),
+        ('?name=Фильм', 2),
+        ('?year=2000', 2),
+        ('?category=films', 2),
+        ('?genre=comedy', 2),
+        ('?genre=comedy,horror&genre_mode=all', 2),
+        ('?genre=comedy&category=films&year=2000', 2),
+    ))
+    def test_01_titles_list(self, client, admin_client,
+                            django_assert_num_queries, query, num_queries):
+        create_titles(admin_client)
+        self.create_more_titles()
+        # COUNT(*) для пагинации и страница произведений: категории
+        # и жанры, в том числе для фильтров, берутся из справочника.
+        with django_assert_num_queries(num_queries):
+            response = client.get(self.TITLES_URL + query)
+        data = response.json()
+        assert data['results'], (
+            'Проверьте, что фильтр возвращает произведения.'
+        )
+        assert all(title['genre'] for title in data['results'])
+
+    def test_02_title_detail(self, client, admin_client,
+                             django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        with django_assert_num_queries(1):
+            response = client.get(
+                self.TITLES_DETAIL_URL_TEMPLATE.format(
+                    title_id=titles[0]['id']
+                )
+            )
+        data = response.json()
+        assert data['category']['slug'] == titles[0]['category']
+        assert {genre['slug'] for genre in data['genre']} == set(
+            titles[0]['genre']
+        )
+
+    def test_03_reviews_list_and_create(self, client, admin_client, admin,
+                                        user_client, user, moderator_client,
+                                        moderator, django_assert_num_queries):
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        # Произведение, COUNT(*) и страница отзывов вместе с авторами.
+        with django_assert_num_queries(3):
+            response = client.get(url)
+        assert len(response.json()['results']) == len(reviews)
+
+        # Пользователь из токена, произведение, проверка уникальности,
+        # BEGIN, INSERT отзыва и UPDATE рейтинга произведения.
+        with django_assert_num_queries(6):
+            response = moderator_client.post(
+                url, data={'text': 'text', 'score': 3}
+            )
+        assert response.status_code == HTTPStatus.CREATED
+        assert response.json()['author'] == moderator.username
+        assert response.json()['title'] == titles[0]['name']
+
+    def test_04_comments_list_and_create(self, client, admin_client, admin,
+                                         user_client, user, settings,
+                                         django_assert_num_queries):
+        # Тесты идут в одном процессе, локальный кеш для них общий.
+        settings.AUTH_CACHE_SHARED = True
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id']
+        )
+        # Отзыв, COUNT(*) и страница комментариев вместе с авторами.
+        with django_assert_num_queries(3):
+            response = client.get(url)
+        assert len(response.json()['results']) == len(comments)
+
+        # Отзыв и INSERT комментария: пользователь из токена берётся
+        # из кеша аутентификации.
+        with django_assert_num_queries(2):
+            response = user_client.post(url, data={'text': 'text'})
+        assert response.status_code == HTTPStatus.CREATED
+        assert response.json()['author'] == user.username
+
+        response = client.get(self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[1]['id'], review_id=reviews[0]['id']
+        ))
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что комментарии к отзыву не отдаются по адресу '
+            'другого произведения.'
+        )
+
+    def test_05_query_budget_headers(self, client, admin_client, admin,
+                                     user_client, user):
+        from api.query_budget import report
+
+        report.reset()
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title_id = titles[0]['id']
+        review_id = reviews[0]['id']
+        urls = (
+            self.TITLES_URL,
+            self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=title_id),
+            self.REVIEWS_URL_TEMPLATE.format(title_id=title_id),
+            self.COMMENTS_URL_TEMPLATE.format(
+                title_id=title_id, review_id=review_id
+            ),
+            '/api/v1/categories/',
+            '/api/v1/genres/',
+        )
+        for url in urls:
+            check_query_budget(client.get(url), url)
+            check_query_budget(user_client.get(url), url)
+
+        response = client.get(self.TITLES_URL)
+        assert response['X-Query-Endpoint'] == 'TitleViewSet.list'
+        assert float(response['X-Query-Time']) >= 0
+
+        stats = report.snapshot()
+        assert stats['TitleViewSet.list']['requests'] == 3
+        assert stats['ReviewViewSet.create']['requests'] == len(reviews)
+        assert stats['CommentViewSet.create']['requests'] == len(comments)
+        assert not any(item['over_budget'] for item in stats.values()), (
+            'Проверьте, что эндпоинты укладываются в объявленный бюджет '
+            'SQL-запросов.'
+        )
+
+    def test_06_reference_data_without_queries(self, client, admin_client):
+        titles, categories, genres = create_titles(admin_client)
+        data = {
+            'name': 'Чужой',
+            'year': 1979,
+            'genre': [genres[0]['slug'], genres[2]['slug']],
+            'category': categories[0]['slug'],
+        }
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(self.TITLES_URL, data=data)
+        assert response.status_code == HTTPStatus.CREATED
+        assert not any(
+            '"slug" = ' in query['sql'] for query in context.captured_queries
+        ), (
+            'Проверьте, что слаги жанров и категории ищутся в справочнике '
+            'без запросов к БД.'
+        )
+
+        admin_client.post(
+            '/api/v1/genres/', data={'name': 'Фантастика', 'slug': 'sci-fi'}
+        )
+        url = f'{self.TITLES_URL}{titles[1]["id"]}/'
+        response = admin_client.patch(url, data={'genre': ['sci-fi']})
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что новый жанр сразу доступен в справочнике.'
+        )
+        check_query_budget(response, url)
+        data = client.get(f'{self.TITLES_URL}{titles[1]["id"]}/').json()
+        assert data['genre'] == [{'name': 'Фантастика', 'slug': 'sci-fi'}]
+
+    def test_07_signup_and_token(self, client, django_user_model, settings,
+                                 django_assert_max_num_queries):
+        from django.contrib.auth.tokens import default_token_generator
+
+        from api.utils import forget_confirmation_code
+
+        # Письмо остаётся в очереди, его отправляет отдельный процесс.
+        settings.EMAIL_OUTBOX = {**settings.EMAIL_OUTBOX, 'EAGER': False}
+        data = {'username': 'reader', 'email': 'reader@yamdb.fake'}
+        # INSERT пользователя и письма в очередь.
+        with django_assert_max_num_queries(2):
+            response = client.post('/api/v1/auth/signup/', data=data)
+        assert response.status_code == HTTPStatus.OK
+        assert response['X-Query-Endpoint'] == 'SignUpView.post'
+        assert response['X-Query-Budget'] == '2'
+        with django_assert_max_num_queries(2):
+            response = client.post('/api/v1/auth/signup/', data={
+                'username': 'reader', 'email': 'other@yamdb.fake'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'username' in response.json()
+
+        # Повторная отправка кода после окна: неудачный INSERT, чтение
+        # пользователя и письмо - отдельный путь со своим бюджетом.
+        forget_confirmation_code(data['username'], data['email'])
+        with django_assert_max_num_queries(3):
+            response = client.post('/api/v1/auth/signup/', data=data)
+        assert response.status_code == HTTPStatus.OK
+        assert response['X-Query-Endpoint'] == 'SignUpView.conflict', (
+            'Проверьте, что повторная регистрация учитывается отдельно '
+            'от регистрации нового пользователя.'
+        )
+        assert int(response['X-Query-Count']) <= int(
+            response['X-Query-Budget']) == 3
+
+        user = django_user_model.objects.get(username='reader')
+        with django_assert_max_num_queries(1):
+            response = client.post('/api/v1/auth/token/', data={
+                'username': 'reader',
+                'confirmation_code': default_token_generator.make_token(user),
+            })
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что токен выдаётся за один запрос к БД.'
+        )
+        assert 'token' in response.json()
+
+    def test_08_bitless_genres_per_page(self, admin_client):
+        from reviews.models import Genre, Title
+        from reviews.reference import reference
+
+        # bulk_create не назначает бит, как жанру сверх MAX_GENRE_BITS.
+        Genre.objects.bulk_create([Genre(name='Без бита', slug='no-bit')])
+        bitless = Genre.objects.get(slug='no-bit')
+        reference.invalidate()
+        url = self.TITLES_URL + '?fields=id,genre'
+        counts = []
+        for count in (2, 5):
+            Title.objects.all().delete()
+            for idx in range(count):
+                Title.objects.create(
+                    name=f'Фильм {idx}', year=2000).genre.add(bitless)
+            admin_client.get(url)
+            with CaptureQueriesContext(connection) as context:
+                data = admin_client.get(url).json()
+            counts.append(len(context.captured_queries))
+            assert [title['genre'] for title in data['results']] == [
+                [{'name': 'Без бита', 'slug': 'no-bit'}]] * count
+        assert counts[0] == counts[1], (
+            'Проверьте, что жанры без бита в маске загружаются одним '
+            'запросом на страницу, а не на каждое произведение.'
+        )
+
+    def test_09_reference_reloads_on_miss(self, client, admin_client):
+        from reviews.models import Category, Genre, Title
+        from reviews.reference import reference
+
+        titles, _, _ = create_titles(admin_client)
+        client.get(self.TITLES_URL)
+        # bulk_create не отправляет сигналов: так справочники видит
+        # процесс, до которого не дошло поколение из другого процесса.
+        bit = max(Genre.objects.values_list('bit', flat=True)) + 1
+        Genre.objects.bulk_create([Genre(name='Нуар', slug='noir', bit=bit)])
+        Category.objects.bulk_create([Category(name='Сериал', slug='serial')])
+        snapshot = reference.snapshot()
+        assert snapshot.get_by_slug(Genre, 'noir') is None
+
+        response = admin_client.post(self.TITLES_URL, data={
+            'name': 'Мальтийский сокол',
+            'year': 1941,
+            'genre': ['noir'],
+            'category': 'serial',
+        })
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что справочник перечитывается, если слага нет '
+            'в снимке процесса.'
+        )
+
+        Genre.objects.bulk_create(
+            [Genre(name='Вестерн', slug='western', bit=bit + 1)])
+        Title.objects.filter(pk=titles[0]['id']).update(
+            genre_mask=1 << (bit + 1))
+        western = {'name': 'Вестерн', 'slug': 'western'}
+        detail = client.get(f'{self.TITLES_URL}{titles[0]["id"]}/').json()
+        assert detail['genre'] == [western], (
+            'Проверьте, что справочник перечитывается, если в маске жанров '
+            'есть биты, которых нет в снимке процесса.'
+        )
+        Genre.objects.bulk_create(
+            [Genre(name='Мюзикл', slug='musical', bit=bit + 2)])
+        Title.objects.filter(pk=titles[1]['id']).update(
+            genre_mask=1 << (bit + 2))
+        results = client.get(
+            f'{self.TITLES_URL}?fields=id,genre').json()['results']
+        assert {'name': 'Мюзикл', 'slug': 'musical'} in [
+            genre for title in results for genre in title['genre']]
@@ -0,0 +1,61 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_comments
+
+
+def get_main_query(captured_queries, table):
+    """Возвращает запрос страницы выдачи из указанной таблицы."""
+    for query in captured_queries:
+        sql = query['sql']
+        if sql.startswith('SELECT') and f'FROM "{table}"' in sql and (
+                'LIMIT' in sql and 'COUNT(' not in sql):
+            return sql
+    raise AssertionError(f'Не найден запрос страницы из таблицы `{table}`.')
+
+
+def get_query_plan(sql):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite',
+    reason='Проверка планов написана для EXPLAIN QUERY PLAN в SQLite.'
+)
+@pytest.mark.django_db(transaction=True)
+class Test10IndexUsage:
+
+    @pytest.mark.parametrize('url, table', (
+        ('/api/v1/titles/', 'reviews_title'),
+        ('/api/v1/titles/?year=1984', 'reviews_title'),
+        ('/api/v1/titles/?category=films', 'reviews_title'),
+        ('/api/v1/titles/{title_id}/reviews/', 'reviews_review'),
+        (
+            '/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+            'reviews_comment'
+        ),
+    ))
+    def test_01_main_query_uses_index(self, client, admin_client, admin,
+                                      user_client, user, url, table):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        url = url.format(title_id=titles[0]['id'], review_id=reviews[0]['id'])
+        with CaptureQueriesContext(connection) as context:
+            client.get(url)
+        plan = get_query_plan(get_main_query(context.captured_queries, table))
+
+        assert not any('TEMP B-TREE' in step for step in plan), (
+            f'Основной запрос `{url}` сортирует выдачу во временном B-дереве '
+            f'вместо индекса: {plan}'
+        )
+        assert not any(
+            step.startswith(f'SCAN {table}') and 'INDEX' not in step
+            for step in plan
+        ), f'Основной запрос `{url}` полностью сканирует `{table}`: {plan}'
+        assert any(table in step and 'INDEX' in step for step in plan), (
+            f'Основной запрос `{url}` не использует индекс `{table}`: {plan}'
+        )
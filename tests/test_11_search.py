@@ -0,0 +1,87 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11TitleSearch:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLES_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+
+    def search(self, client, query):
+        response = client.get(self.TITLES_URL, {'search': query})
+        assert response.status_code == HTTPStatus.OK
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_search_ranked_by_relevance(self, client, admin_client):
+        _, categories, genres = create_titles(admin_client)
+        for name, description in (
+            ('Back to the Future', 'Марти отправляется в прошлое'),
+            ('Назад', 'Come back, come back, come back'),
+        ):
+            response = admin_client.post(self.TITLES_URL, data={
+                'name': name,
+                'year': 1985,
+                'genre': [genres[1]['slug']],
+                'category': categories[0]['slug'],
+                'description': description,
+            })
+            assert response.status_code == HTTPStatus.CREATED
+
+        names = self.search(client, 'back')
+        assert names[0] == 'Back to the Future', (
+            'Проверьте, что при поиске по параметру `search` совпадения '
+            'в названии ранжируются выше совпадений в описании.'
+        )
+        assert set(names) == {'Back to the Future', 'Назад', 'Терминатор'}
+
+        assert self.search(client, 'терминат') == ['Терминатор'], (
+            'Проверьте, что последнее слово запроса ищется по префиксу.'
+        )
+        assert self.search(client, 'yippie ki') == ['Крепкий орешек']
+        assert self.search(client, '"AND (') == []
+        assert self.search(client, 'nothing-like-this') == []
+
+    def test_02_search_index_follows_title_writes(self, client,
+                                                  admin_client):
+        titles, _, _ = create_titles(admin_client)
+        detail_url = self.TITLES_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[0]['id']
+        )
+        response = admin_client.patch(
+            detail_url, data={'name': 'Робокоп', 'description': 'Детройт'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert self.search(client, 'Терминатор') == []
+        assert self.search(client, 'детройт') == ['Робокоп'], (
+            'Проверьте, что поисковый индекс обновляется при изменении '
+            'произведения.'
+        )
+
+        response = admin_client.delete(detail_url)
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert self.search(client, 'Робокоп') == [], (
+            'Проверьте, что удалённые произведения исчезают из поиска.'
+        )
+
+    def test_03_triggers_survive_migrations(self):
+        from django.db import connection
+
+        from reviews.search import FTS_TABLE, fts_available
+
+        if not fts_available():
+            pytest.skip('SQLite собран без FTS5.')
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger' "
+                "AND tbl_name = 'reviews_title'")
+            triggers = {row[0] for row in cursor.fetchall()}
+        assert triggers == {
+            f'{FTS_TABLE}_ai', f'{FTS_TABLE}_ad', f'{FTS_TABLE}_au'
+        }, (
+            'Проверьте, что миграции, пересоздающие таблицу произведений, '
+            'восстанавливают триггеры поискового индекса.'
+        )
@@ -0,0 +1,97 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.fixture
+def autocomplete_index():
+    from reviews.autocomplete import autocomplete
+
+    autocomplete.invalidate()
+    yield autocomplete
+    autocomplete.invalidate()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12Autocomplete:
+
+    URL = '/api/v1/autocomplete/'
+
+    def test_01_prefix_search(self, client, admin_client,
+                              autocomplete_index, django_assert_num_queries):
+        create_titles(admin_client)
+        response = client.get(self.URL, {'q': 'те'})
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == {
+            'titles': [{'id': response.json()['titles'][0]['id'],
+                        'name': 'Терминатор'}],
+            'genres': [],
+            'categories': [],
+        }
+
+        with django_assert_num_queries(0):
+            response = client.get(self.URL, {'q': 'ОРЕШ', 'type': 'titles'})
+        assert [item['name'] for item in response.json()['titles']] == [
+            'Крепкий орешек'
+        ], 'Проверьте, что автодополнение ищет по началу любого слова.'
+
+        response = client.get(
+            self.URL, {'q': 'c', 'type': 'genres,categories'}
+        )
+        assert response.json() == {
+            'genres': [{'name': 'Комедия', 'slug': 'comedy'}],
+            'categories': [],
+        }
+        response = client.get(self.URL, {'q': 'ф', 'type': 'categories'})
+        assert response.json() == {
+            'categories': [{'name': 'Фильм', 'slug': 'films'}],
+        }
+
+        response = client.get(self.URL, {'q': 'a', 'type': 'users'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_02_index_follows_writes(self, client, admin_client,
+                                     autocomplete_index,
+                                     django_assert_num_queries):
+        titles, _, genres = create_titles(admin_client)
+        client.get(self.URL, {'q': 'x'})
+
+        admin_client.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/', data={'name': 'Робокоп'}
+        )
+        admin_client.post(
+            '/api/v1/genres/', data={'name': 'Роман', 'slug': 'novel'}
+        )
+        admin_client.delete(f'/api/v1/genres/{genres[0]["slug"]}/')
+
+        with django_assert_num_queries(0):
+            response = client.get(self.URL, {'q': 'ро'})
+        data = response.json()
+        assert [item['name'] for item in data['titles']] == ['Робокоп'], (
+            'Проверьте, что индекс автодополнения обновляется при '
+            'изменении произведения без полной перестройки.'
+        )
+        assert data['genres'] == [{'name': 'Роман', 'slug': 'novel'}]
+        assert client.get(self.URL, {'q': 'Терм'}).json()['titles'] == []
+        assert client.get(self.URL, {'q': 'horr'}).json()['genres'] == []
+
+    def test_03_index_expires(self, client, admin_client, autocomplete_index):
+        from reviews.autocomplete import AUTOCOMPLETE_MAX_AGE
+        from reviews.models import Category, Title
+
+        create_titles(admin_client)
+        client.get(self.URL, {'q': 'x'})
+        # bulk_create не отправляет сигналов, как запись в другом
+        # процессе с кешем LocMemCache.
+        Title.objects.bulk_create([Title(
+            name='Чужой', year=1979, category=Category.objects.first())])
+        assert client.get(self.URL, {'q': 'Чуж'}).json()['titles'] == []
+
+        autocomplete_index._built -= AUTOCOMPLETE_MAX_AGE + 1
+        titles = client.get(self.URL, {'q': 'Чуж'}).json()['titles']
+        assert [title['name'] for title in titles] == ['Чужой'], (
+            'Проверьте, что индекс автодополнения перестраивается, когда '
+            'старше AUTOCOMPLETE_MAX_AGE.'
+        )
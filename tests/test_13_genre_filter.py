@@ -0,0 +1,111 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13GenreFilter:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def get_names(self, client, query):
+        response = client.get(self.TITLES_URL + query)
+        assert response.status_code == HTTPStatus.OK
+        names = [title['name'] for title in response.json()['results']]
+        assert len(names) == len(set(names)), (
+            'Проверьте, что фильтр по жанрам не дублирует произведения.'
+        )
+        return sorted(names)
+
+    def test_01_multi_genre_modes(self, client, admin_client):
+        # Терминатор: horror, comedy; Крепкий орешек: drama.
+        create_titles(admin_client)
+
+        assert self.get_names(client, '?genre=horror') == ['Терминатор']
+        assert self.get_names(client, '?genre=HORROR,drama') == [
+            'Крепкий орешек', 'Терминатор'
+        ], 'Проверьте, что по умолчанию жанры объединяются через ИЛИ.'
+        assert self.get_names(
+            client, '?genre=horror,drama&genre_mode=all'
+        ) == []
+        assert self.get_names(
+            client, '?genre=horror,comedy&genre_mode=all'
+        ) == ['Терминатор']
+        assert self.get_names(
+            client, '?genre=comedy,unknown&genre_mode=any'
+        ) == ['Терминатор']
+        assert self.get_names(
+            client, '?genre=comedy,unknown&genre_mode=all'
+        ) == []
+        response = client.get(self.TITLES_URL + '?genre=drama&genre_mode=x')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_02_mask_follows_genre_changes(self, client, admin_client):
+        from reviews.models import Genre, Title
+
+        titles, _, genres = create_titles(admin_client)
+        response = admin_client.patch(
+            f'{self.TITLES_URL}{titles[1]["id"]}/',
+            data={'genre': [genres[0]['slug'], genres[2]['slug']]}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert self.get_names(
+            client, '?genre=horror,drama&genre_mode=all'
+        ) == ['Крепкий орешек'], (
+            'Проверьте, что маска жанров обновляется при изменении жанров '
+            'произведения.'
+        )
+
+        title = Title.objects.get(pk=titles[0]['id'])
+        title.genre.clear()
+        assert self.get_names(client, '?genre=comedy') == []
+
+        comedy = Genre.objects.get(slug='comedy')
+        comedy.title_set.add(title)
+        assert self.get_names(client, '?genre=comedy') == ['Терминатор']
+
+        response = admin_client.delete('/api/v1/genres/horror/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert Title.objects.get(pk=titles[1]['id']).genre_mask == (
+            Genre.objects.get(slug='drama').mask
+        ), 'Проверьте, что удаление жанра очищает его бит в масках.'
+
+        response = admin_client.post(
+            '/api/v1/genres/', data={'name': 'Триллер', 'slug': 'thriller'}
+        )
+        assert Genre.objects.get(slug='thriller').bit == 0, (
+            'Проверьте, что новый жанр получает наименьший свободный бит.'
+        )
+        assert self.get_names(client, '?genre=thriller') == []
+
+    def test_03_recalculate_genre_masks_command(self, client, admin_client):
+        from django.core.management import call_command
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from reviews.models import Genre, Title
+
+        titles, _, _ = create_titles(admin_client)
+        expected = {
+            title.pk: sum(genre.mask for genre in title.genre.all())
+            for title in Title.objects.all()
+        }
+        Title.objects.update(genre_mask=0)
+        with CaptureQueriesContext(connection) as context:
+            call_command('recalculate_genre_masks')
+        updates = [
+            query for query in context.captured_queries
+            if query['sql'].startswith('UPDATE "reviews_title"')
+        ]
+        assert len(updates) == 1, (
+            'Проверьте, что маски жанров пересчитываются одним UPDATE.'
+        )
+        assert dict(
+            Title.objects.values_list('pk', 'genre_mask')) == expected
+        assert all(expected.values())
+        assert self.get_names(client, '?genre=comedy') == [
+            title.name for title in Title.objects.filter(
+                genre=Genre.objects.get(slug='comedy')).order_by('name')
+        ]
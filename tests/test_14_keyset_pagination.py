@@ -0,0 +1,118 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_reviews, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14KeysetPagination:
+
+    TITLES_URL = '/api/v1/titles/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    @staticmethod
+    def walk(client, url, key):
+        """Проходит все страницы вперёд, затем обратно."""
+        pages = []
+        while url:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            data = response.json()
+            assert set(data) == {'next', 'previous', 'results'}, (
+                'Проверьте, что в keyset-режиме ответ содержит только '
+                '`next`, `previous` и `results`.'
+            )
+            pages.append([item[key] for item in data['results']])
+            last = data
+            url = data['next']
+        backward = []
+        url = last['previous']
+        while url:
+            data = client.get(url).json()
+            backward.insert(0, [item[key] for item in data['results']])
+            url = data['previous']
+        return pages, backward
+
+    def test_01_comments_cursor(self, client, admin_client, admin,
+                                user_client, user):
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id']
+        )
+        texts = [f'comment {idx}' for idx in range(12)]
+        for text in texts:
+            user_client.post(url, data={'text': text})
+
+        with CaptureQueriesContext(connection) as context:
+            next_url = client.get(url + '?cursor=').json()['next']
+        assert not any(
+            'COUNT(' in query['sql'] for query in context.captured_queries
+        ), 'Проверьте, что в keyset-режиме не выполняется COUNT(*).'
+        with CaptureQueriesContext(connection) as context:
+            client.get(next_url)
+        seek = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'FROM "reviews_comment"' in query['sql']
+        ]
+        assert seek and all(
+            '"reviews_comment"."id") > (' in sql and ' OR ' not in sql
+            for sql in seek
+        ), (
+            'Проверьте, что следующая страница выбирается сравнением '
+            '`(pub_date, id) > (...)`, а не раскрытием в OR.'
+        )
+
+        pages, backward = self.walk(client, url + '?cursor=', 'text')
+        assert [len(page) for page in pages] == [5, 5, 2]
+        assert sum(pages, []) == texts, (
+            'Проверьте, что keyset-пагинация отдаёт комментарии по '
+            '(pub_date, id) без пропусков и повторов.'
+        )
+        assert backward == pages[:-1]
+
+        response = client.get(url)
+        assert response.json()['count'] == 12, (
+            'Проверьте, что без параметра `cursor` сохраняется '
+            'постраничная пагинация.'
+        )
+
+        response = client.get(url + '?cursor=broken')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_02_titles_and_reviews_cursor(self, client, admin_client,
+                                          django_user_model):
+        from reviews.models import Review, Title
+
+        titles, _, _ = create_titles(admin_client)
+        for _ in range(6):
+            Title.objects.create(name='Дубль', year=2000)
+        title_ids = list(
+            Title.objects.order_by('name', 'id').values_list('id', flat=True)
+        )
+        pages, backward = self.walk(client, self.TITLES_URL + '?cursor=', 'id')
+        assert sum(pages, []) == title_ids, (
+            'Проверьте, что keyset-пагинация произведений идёт по '
+            '(name, id) и не теряет записи с одинаковым названием.'
+        )
+        assert backward == pages[:-1]
+
+        for idx in range(7):
+            author = django_user_model.objects.create_user(
+                username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+            )
+            Review.objects.create(
+                title_id=titles[0]['id'], author=author, text=f'{idx}',
+                score=5
+            )
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        pages, _ = self.walk(client, url + '?cursor=', 'text')
+        assert sum(pages, []) == [str(idx) for idx in range(7)]
@@ -0,0 +1,94 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_titles
+
+
+def count_queries(captured_queries):
+    return sum('COUNT(' in query['sql'] for query in captured_queries)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15CachedCount:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_count_served_from_cache(self, client, admin_client):
+        titles, _, genres = create_titles(admin_client)
+        url = self.TITLES_URL + '?genre=horror,drama'
+
+        with CaptureQueriesContext(connection) as context:
+            assert client.get(url).json()['count'] == 2
+        assert count_queries(context.captured_queries) == 1
+
+        with CaptureQueriesContext(connection) as context:
+            assert client.get(url).json()['count'] == 2
+        assert count_queries(context.captured_queries) == 0, (
+            'Проверьте, что повторный запрос с теми же фильтрами берёт '
+            '`count` из кеша.'
+        )
+        with CaptureQueriesContext(connection) as context:
+            assert client.get(
+                self.TITLES_URL + '?genre=comedy'
+            ).json()['count'] == 1
+        assert count_queries(context.captured_queries) == 1
+
+        admin_client.patch(
+            f'{self.TITLES_URL}{titles[0]["id"]}/',
+            data={'genre': [genres[1]['slug']]}
+        )
+        assert client.get(url).json()['count'] == 1, (
+            'Проверьте, что закешированное количество сбрасывается при '
+            'изменении данных.'
+        )
+        admin_client.delete(f'{self.TITLES_URL}{titles[1]["id"]}/')
+        assert client.get(url).json()['count'] == 0
+
+    def test_02_skip_count(self, client, admin_client):
+        from reviews.models import Title
+
+        create_titles(admin_client)
+        for idx in range(4):
+            Title.objects.create(name=f'Фильм {idx}', year=2000)
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(self.TITLES_URL + '?count=false')
+        assert count_queries(context.captured_queries) == 0
+        data = response.json()
+        assert set(data) == {'next', 'previous', 'results'}, (
+            'Проверьте, что с параметром `count=false` ответ не содержит '
+            '`count`.'
+        )
+        assert len(data['results']) == 5
+        assert data['previous'] is None
+        assert 'page=2' in data['next']
+
+        data = client.get(data['next']).json()
+        assert len(data['results']) == 1
+        assert data['next'] is None
+        assert data['previous'] is not None
+
+        response = client.get(self.TITLES_URL + '?count=false&page=0')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_03_count_reset_when_genre_bit_reused(self, admin_client):
+        from reviews.models import Genre, Title
+
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        for idx in range(3):
+            Title.objects.create(
+                name=f'Фильм {idx}', year=2000).genre.add(genre)
+        url = self.TITLES_URL + '?genre=drama'
+        assert admin_client.get(url).json()['count'] == 3
+
+        genre.delete()
+        reused = Genre.objects.create(name='Новая драма', slug='drama')
+        assert reused.bit == genre.bit
+        data = admin_client.get(url).json()
+        assert (data['count'], data['results']) == (0, []), (
+            'Проверьте, что закешированное количество сбрасывается, когда '
+            'маски жанров меняются через update() при удалении жанра.'
+        )
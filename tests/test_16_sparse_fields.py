@@ -0,0 +1,90 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16SparseFields:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_titles_fields(self, client, admin_client, admin,
+                              user_client, user):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(self.TITLES_URL + '?fields=id,name,rating')
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert all(
+            set(title) == {'id', 'name', 'rating'}
+            for title in data['results']
+        ), 'Проверьте, что параметр `fields` ограничивает поля ответа.'
+        assert {title['name']: title['rating'] for title in data['results']}[
+            titles[0]['name']
+        ] == 5
+        page_query = next(
+            query['sql'] for query in context.captured_queries
+            if 'LIMIT' in query['sql']
+        )
+        assert '"description"' not in page_query
+        assert 'reviews_category' not in page_query, (
+            'Проверьте, что незапрошенные связи не загружаются.'
+        )
+        assert len(context.captured_queries) == 2, (
+            'Проверьте, что без поля `genre` жанры не подгружаются.'
+        )
+
+        response = client.get(
+            f'{self.TITLES_URL}{titles[0]["id"]}/?fields=genre,category'
+        )
+        assert response.json() == {
+            'genre': [
+                {'name': 'Комедия', 'slug': 'comedy'},
+                {'name': 'Ужасы', 'slug': 'horror'},
+            ],
+            'category': {'name': 'Фильм', 'slug': 'films'},
+        }
+
+        response = client.get(self.TITLES_URL + '?fields=id,unknown')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_02_nested_and_reference_fields(self, client, admin_client,
+                                            admin, user_client, user):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        url = f'{self.TITLES_URL}{titles[0]["id"]}/reviews/'
+        with CaptureQueriesContext(connection) as context:
+            data = client.get(url + '?fields=id,score&cursor=').json()
+        assert [set(review) for review in data['results']] == [
+            {'id', 'score'}
+        ] * len(reviews)
+        assert not any(
+            'users_myuser' in query['sql']
+            for query in context.captured_queries
+        ), 'Проверьте, что без поля `author` авторы не загружаются.'
+
+        data = client.get(
+            f'{url}{reviews[0]["id"]}/comments/?fields=author,text'
+        ).json()
+        assert data['results'] == [
+            {'author': comment['author'], 'text': comment['text']}
+            for comment in comments
+        ]
+
+        data = client.get('/api/v1/genres/?fields=slug').json()
+        assert data['results'] == [
+            {'slug': 'drama'}, {'slug': 'comedy'}, {'slug': 'horror'}
+        ]
+
+        response = admin_client.get('/api/v1/users/?fields=username,role')
+        assert all(
+            set(item) == {'username', 'role'}
+            for item in response.json()['results']
+        )
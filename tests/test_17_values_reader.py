@@ -0,0 +1,42 @@
+import pytest
+
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17ValuesReader:
+
+    @pytest.mark.parametrize('url, fields', (
+        (
+            '/api/v1/titles/',
+            'id,name,year,rating,description,genre,category'
+        ),
+        (
+            '/api/v1/titles/{title_id}/reviews/',
+            'id,text,title,author,pub_date,score'
+        ),
+        (
+            '/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+            'id,author,pub_date,text'
+        ),
+    ))
+    def test_01_fast_list_matches_serializer(self, client, admin_client,
+                                             admin, user_client, user,
+                                             url, fields):
+        from reviews.models import Title
+
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        Title.objects.create(name='Без категории', year=2000,
+                             description=None)
+        url = url.format(title_id=titles[0]['id'], review_id=reviews[0]['id'])
+        for query in ('', '?cursor=', '?count=false'):
+            joiner = '&' if query else '?'
+            fast = client.get(url + query)
+            # С явным списком полей ответ строит ModelSerializer.
+            slow = client.get(f'{url}{query}{joiner}fields={fields}')
+            assert fast.content == slow.content, (
+                'Проверьте, что быстрый путь чтения списков отдаёт тот же '
+                'ответ, что и сериализатор.'
+            )
@@ -0,0 +1,82 @@
+import datetime
+from decimal import Decimal
+from io import BytesIO
+
+import pytest
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from tests.utils import create_reviews
+
+
+class Test18JSON:
+
+    DATA = {
+        'pub_date': datetime.datetime(
+            2021, 7, 1, 12, 30, 15, 123456, tzinfo=timezone.utc),
+        'date': datetime.date(2021, 7, 1),
+        'price': Decimal('10.50'),
+        'label': gettext_lazy('Произведение'),
+        'text': 'Строка с разделителем ',
+        'items': ({'id': 1, 'rating': None}, [True, 1.5]),
+        1: 'числовой ключ',
+        'big': 2 ** 70,
+    }
+
+    def test_01_renderer_matches_json_renderer(self):
+        from api.renderers import FastJSONRenderer
+
+        for data in (self.DATA, {'big': 1}, [], None, ''):
+            assert FastJSONRenderer().render(data) == JSONRenderer().render(
+                data
+            ), (
+                'Проверьте, что FastJSONRenderer отдаёт то же, что '
+                'JSONRenderer: даты, Decimal, ленивые строки и U+2028.'
+            )
+        assert FastJSONRenderer().render(
+            {'id': 1}, 'application/json; indent=4'
+        ) == JSONRenderer().render({'id': 1}, 'application/json; indent=4')
+
+    def test_02_fallback_without_orjson(self, monkeypatch):
+        from api import parsers, renderers
+
+        monkeypatch.setattr(renderers, 'orjson', None)
+        monkeypatch.setattr(parsers, 'orjson', None)
+        assert renderers.FastJSONRenderer().render(
+            self.DATA
+        ) == JSONRenderer().render(self.DATA)
+        assert parsers.FastJSONParser().parse(BytesIO(b'{"id": 1}')) == {
+            'id': 1
+        }
+
+    def test_03_parser(self):
+        from api.parsers import FastJSONParser
+
+        content = '{"text": "Отзыв", "score": 10, "items": [1.5, null]}'
+        stream = BytesIO(content.encode())
+        assert FastJSONParser().parse(stream) == JSONParser().parse(
+            BytesIO(content.encode())
+        )
+        for content in (b'{"text": ', b'{"score": NaN}'):
+            with pytest.raises(ParseError):
+                FastJSONParser().parse(BytesIO(content))
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_api_uses_fast_json(self, client, admin_client, admin,
+                                   user_client, user):
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        response = client.get(f'/api/v1/titles/{titles[0]["id"]}/reviews/')
+        assert response['Content-Type'] == 'application/json'
+        data = response.json()
+        assert data['results'][0]['pub_date'].endswith('Z')
+        response = user_client.post(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}'
+            '/comments/',
+            data='{"text": "Комментарий"}', content_type='application/json'
+        )
+        assert response.json()['text'] == 'Комментарий'
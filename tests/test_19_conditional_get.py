@@ -0,0 +1,140 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_comments, create_titles
+
+
+@pytest.fixture(autouse=True)
+def shared_cache(settings):
+    # Тесты идут в одном процессе, локальный кеш для них общий.
+    settings.AUTH_CACHE_SHARED = True
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19ConditionalGet:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @staticmethod
+    def check_not_modified(client, url, response):
+        etag = response['ETag']
+        with CaptureQueriesContext(connection) as context:
+            cached = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert cached.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с актуальным '
+            '`If-None-Match` возвращает 304.'
+        )
+        assert len(context.captured_queries) == 0, (
+            'Проверьте, что ответ 304 отдаётся без запросов к БД.'
+        )
+        assert client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        ).status_code == HTTPStatus.NOT_MODIFIED
+        return etag
+
+    @staticmethod
+    def check_modified(client, url, etag):
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что после изменения данных `{url}` отдаёт 200 '
+            'на старый ETag.'
+        )
+        assert response['ETag'] != etag
+        return response
+
+    def test_01_title_detail_and_list(self, client, admin_client, admin,
+                                      user_client, user, django_user_model):
+        from reviews.models import Genre, Review
+
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        detail_url = f'{self.TITLES_URL}{titles[0]["id"]}/'
+        other_url = f'{self.TITLES_URL}{titles[1]["id"]}/'
+        list_url = self.TITLES_URL + '?genre=comedy'
+        etags = {
+            url: self.check_not_modified(client, url, client.get(url))
+            for url in (detail_url, other_url, list_url)
+        }
+        assert client.get(
+            self.TITLES_URL, HTTP_IF_NONE_MATCH=etags[list_url]
+        ).status_code == HTTPStatus.OK, (
+            'Проверьте, что ETag учитывает параметры запроса.'
+        )
+
+        author = django_user_model.objects.create_user(
+            username='critic', email='critic@yamdb.fake'
+        )
+        Review.objects.create(
+            title_id=titles[0]['id'], author=author, text='Так себе', score=1
+        )
+        response = self.check_modified(client, detail_url, etags[detail_url])
+        assert response.json()['rating'] == 3
+        self.check_modified(client, list_url, etags[list_url])
+        assert client.get(
+            other_url, HTTP_IF_NONE_MATCH=etags[other_url]
+        ).status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что отзыв не меняет версию других произведений.'
+        )
+
+        etag = client.get(other_url)['ETag']
+        genre = Genre.objects.get(slug='drama')
+        genre.name = 'Драма'
+        genre.save()
+        response = self.check_modified(client, other_url, etag)
+        assert response.json()['genre'][0]['name'] == 'Драма'
+
+        response = client.get(f'{self.TITLES_URL}0/')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        assert not response.has_header('ETag')
+
+    def test_02_reviews_and_comments(self, client, admin_client, admin,
+                                     user_client, user):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        reviews_url = f'{self.TITLES_URL}{titles[0]["id"]}/reviews/'
+        review_url = f'{reviews_url}{reviews[0]["id"]}/'
+        comments_url = f'{review_url}comments/'
+        etags = {
+            url: self.check_not_modified(client, url, client.get(url))
+            for url in (reviews_url, review_url, comments_url)
+        }
+
+        user_client.post(comments_url, data={'text': 'Новый комментарий'})
+        self.check_modified(client, comments_url, etags[comments_url])
+        assert client.get(
+            reviews_url, HTTP_IF_NONE_MATCH=etags[reviews_url]
+        ).status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что комментарий не меняет версию списка отзывов.'
+        )
+
+        admin_client.patch(review_url, data={'text': 'Исправленный отзыв'})
+        self.check_modified(client, reviews_url, etags[reviews_url])
+        response = self.check_modified(client, review_url, etags[review_url])
+        assert response.json()['text'] == 'Исправленный отзыв'
+
+        etag = client.get(comments_url)['ETag']
+        admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'username': 'renamed'}
+        )
+        response = self.check_modified(client, comments_url, etag)
+        assert 'renamed' in {
+            comment['author'] for comment in response.json()['results']
+        }
+
+    def test_03_process_local_cache_without_validators(
+            self, client, admin_client, settings):
+        settings.AUTH_CACHE_SHARED = None
+        titles, _, _ = create_titles(admin_client)
+        for url in (self.TITLES_URL, f'{self.TITLES_URL}{titles[0]["id"]}/'):
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            assert not response.has_header('ETag'), (
+                f'Проверьте, что с LocMemCache `{url}` не отдаёт ETag: '
+                'другие процессы не видят новых маркеров версий.'
+            )
+            assert not response.has_header('Last-Modified')
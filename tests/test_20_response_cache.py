@@ -0,0 +1,106 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20ResponseCache:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @staticmethod
+    def get(client, url):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        return response, len(context.captured_queries)
+
+    def check_cached(self, client, url, cached=True):
+        self.get(client, url)
+        response, queries = self.get(client, url)
+        if cached:
+            assert queries == 0, (
+                f'Проверьте, что повторный анонимный GET-запрос к `{url}` '
+                'отдаётся из кеша без запросов к БД.'
+            )
+        else:
+            assert queries > 0, (
+                f'Проверьте, что кеш ответа `{url}` сбрасывается при '
+                'изменении данных.'
+            )
+        return response
+
+    def test_01_cached_and_invalidated(self, client, admin_client,
+                                       django_user_model):
+        from reviews.models import Genre, Review
+
+        titles, _, _ = create_titles(admin_client)
+        detail_url = f'{self.TITLES_URL}{titles[0]["id"]}/'
+        other_url = f'{self.TITLES_URL}{titles[1]["id"]}/'
+        other_list_url = self.TITLES_URL + '?genre=drama'
+        urls = (
+            detail_url, other_url, self.TITLES_URL, other_list_url,
+            '/api/v1/genres/', '/api/v1/categories/',
+        )
+        for url in urls:
+            first, _ = self.get(client, url)
+            response = self.check_cached(client, url)
+            assert response.content == first.content
+            assert response['Content-Type'] == first['Content-Type']
+        assert self.get(
+            client, self.TITLES_URL + '?year=1984&page=1'
+        )[1] > 0
+        assert self.get(
+            client, self.TITLES_URL + '?page=1&year=1984'
+        )[1] == 0, (
+            'Проверьте, что ключ кеша не зависит от порядка параметров.'
+        )
+        assert self.get(admin_client, self.TITLES_URL)[1] > 0, (
+            'Проверьте, что ответы авторизованным пользователям '
+            'не кешируются.'
+        )
+
+        author = django_user_model.objects.create_user(
+            username='critic', email='critic@yamdb.fake'
+        )
+        Review.objects.create(
+            title_id=titles[0]['id'], author=author, text='Отлично',
+            score=9
+        )
+        response, queries = self.get(client, detail_url)
+        assert queries > 0 and response.json()['rating'] == 9, (
+            'Проверьте, что новый отзыв сбрасывает кеш карточки '
+            'произведения.'
+        )
+        assert self.get(client, self.TITLES_URL)[1] > 0
+        for url in (other_url, other_list_url, '/api/v1/genres/'):
+            assert self.get(client, url)[1] == 0, (
+                'Проверьте, что отзыв сбрасывает только записи кеша, '
+                f'содержащие его произведение, а не `{url}`.'
+            )
+
+        for url in urls:
+            self.get(client, url)
+        genre = Genre.objects.get(slug='comedy')
+        genre.name = 'Комедия!'
+        genre.save()
+        response, queries = self.get(client, detail_url)
+        assert queries > 0 and 'Комедия!' in {
+            genre['name'] for genre in response.json()['genre']
+        }, (
+            'Проверьте, что переименование жанра сбрасывает кеш '
+            'произведений этого жанра.'
+        )
+        assert self.get(client, '/api/v1/genres/')[1] > 0
+        for url in (other_url, other_list_url, '/api/v1/categories/'):
+            assert self.get(client, url)[1] == 0
+
+        admin_client.post(
+            '/api/v1/categories/', data={'name': 'Игра', 'slug': 'games'}
+        )
+        data = self.check_cached(client, '/api/v1/categories/').json()
+        assert 'games' in {category['slug'] for category in data['results']}
+        admin_client.delete(detail_url)
+        assert self.get(client, other_url)[1] == 0
+        assert self.get(client, detail_url)[0].status_code == 404
@@ -0,0 +1,122 @@
+import json
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_categories, create_genre
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21BulkTitles:
+
+    URL = '/api/v1/titles/bulk/'
+
+    def test_01_bulk_create(self, client, admin_client, user_client):
+        from reviews.models import Title
+
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        payload = [
+            {
+                'name': f'Фильм {idx}',
+                'year': 2000 + idx % 20,
+                'genre': [genres[idx % 3]['slug'], genres[0]['slug']],
+                'category': categories[idx % 2]['slug'],
+            }
+            for idx in range(300)
+        ]
+        assert user_client.post(
+            self.URL, data=payload, format='json'
+        ).status_code == HTTPStatus.FORBIDDEN
+        assert client.post(
+            self.URL, data=json.dumps(payload),
+            content_type='application/json'
+        ).status_code == HTTPStatus.UNAUTHORIZED
+
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(self.URL, data=payload, format='json')
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что администратор может создать список '
+            'произведений POST-запросом к `/api/v1/titles/bulk/`.'
+        )
+        assert len(context.captured_queries) < 15, (
+            'Проверьте, что произведения и связи с жанрами создаются '
+            'через bulk_create, а не по одному.'
+        )
+        data = response.json()
+        assert len(data) == len(payload)
+        assert [item['name'] for item in data] == [
+            item['name'] for item in payload
+        ]
+        assert data[1]['genre'] == [genres[1]['slug'], genres[0]['slug']]
+        assert data[0]['genre'] == [genres[0]['slug']]
+
+        title = Title.objects.get(pk=data[4]['id'])
+        assert title.name == 'Фильм 4'
+        assert title.category.slug == payload[4]['category']
+        assert set(title.genre.values_list('slug', flat=True)) == set(
+            payload[4]['genre']
+        )
+        response = client.get(f'/api/v1/titles/{title.pk}/')
+        assert {genre['slug'] for genre in response.json()['genre']} == set(
+            payload[4]['genre']
+        ), 'Проверьте, что маска жанров заполняется при массовом создании.'
+        response = client.get(
+            f'/api/v1/titles/?genre={genres[2]["slug"]}&count=true'
+        )
+        assert response.json()['count'] == 100
+        assert client.get('/api/v1/titles/').json()['count'] == 300
+
+    def test_02_bulk_validation(self, admin_client):
+        from reviews.models import Title
+
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        valid = {
+            'name': 'Фильм', 'year': 2000,
+            'genre': [genres[0]['slug']], 'category': categories[0]['slug'],
+        }
+        payload = [
+            valid,
+            {**valid, 'genre': ['unknown']},
+            valid,
+            {**valid, 'year': 3000, 'category': 'unknown'},
+        ]
+        response = admin_client.post(self.URL, data=payload, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        errors = response.json()
+        assert len(errors) == len(payload), (
+            'Проверьте, что ответ содержит ошибки по каждому элементу.'
+        )
+        assert errors[0] == {} and errors[2] == {}
+        assert set(errors[1]) == {'genre'}
+        assert set(errors[3]) == {'year', 'category'}
+        assert not Title.objects.exists(), (
+            'Проверьте, что при ошибках ничего не создаётся.'
+        )
+        response = admin_client.post(self.URL, data=valid, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_03_bulk_insert_needs_returned_keys(self, monkeypatch):
+        from django.db import NotSupportedError
+
+        from reviews.models import Title
+        from reviews.utils import bulk_insert
+
+        titles = bulk_insert(Title, [
+            Title(name=f'Фильм {idx}', year=2000) for idx in range(3)
+        ])
+        assert [title.pk for title in titles] == list(
+            Title.objects.order_by('pk').values_list('pk', flat=True))
+
+        # Без блокировки записи SQLite последние id таблицы могут
+        # принадлежать чужим строкам.
+        monkeypatch.setattr(connection, 'vendor', 'postgresql')
+        with pytest.raises(NotSupportedError):
+            bulk_insert(Title, [Title(name='Фильм', year=2000)])
+        assert Title.objects.count() == 3, (
+            'Проверьте, что bulk_insert откатывает INSERT, если не может '
+            'надёжно восстановить первичные ключи.'
+        )
@@ -0,0 +1,105 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22BulkReviews:
+
+    URL = '/api/v1/reviews/bulk/'
+
+    def test_01_bulk_reviews(self, client, admin_client, admin, user_client,
+                             user, django_user_model):
+        from reviews.models import Review, Title
+
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        django_user_model.objects.bulk_create(
+            django_user_model(
+                username=f'partner{idx}', email=f'partner{idx}@yamdb.fake'
+            )
+            for idx in range(100)
+        )
+        payload = [
+            {
+                'title': titles[idx % 2]['id'],
+                'author': f'partner{idx // 2}',
+                'text': f'Отзыв {idx}',
+                'score': idx % 10 + 1,
+            }
+            for idx in range(200)
+        ]
+        assert user_client.post(
+            self.URL, data=payload, format='json'
+        ).status_code == HTTPStatus.FORBIDDEN
+
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(self.URL, data=payload, format='json')
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что администратор может загрузить пакет отзывов '
+            'POST-запросом к `/api/v1/reviews/bulk/`.'
+        )
+        assert len(context.captured_queries) < 15, (
+            'Проверьте, что пакет отзывов проверяется и создаётся '
+            'множественными запросами, а не по одному отзыву.'
+        )
+        rating_updates = [
+            query for query in context.captured_queries
+            if query['sql'].startswith('UPDATE "reviews_title"')
+        ]
+        assert len(rating_updates) == 2, (
+            'Проверьте, что агрегаты произведения обновляются один раз '
+            'на произведение.'
+        )
+        data = response.json()
+        assert len(data) == len(payload)
+        assert data[3]['author'] == 'partner1'
+        assert data[3]['title'] == titles[1]['id']
+        assert Review.objects.count() == len(reviews) + len(payload)
+
+        for title in Title.objects.filter(pk__in=[t['id'] for t in titles]):
+            scores = list(title.reviews.values_list('score', flat=True))
+            assert title.review_count == len(scores)
+            assert title.score_sum == sum(scores)
+            assert title.rating == sum(scores) // len(scores)
+        response = client.get(f'/api/v1/titles/{titles[1]["id"]}/reviews/')
+        assert response.json()['count'] == 100
+
+    def test_02_bulk_reviews_validation(self, admin_client, admin,
+                                        user_client, user):
+        from reviews.models import Review
+
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        valid = {
+            'title': titles[1]['id'], 'author': user.username,
+            'text': 'Отзыв', 'score': 5,
+        }
+        payload = [
+            valid,
+            {**valid, 'title': titles[0]['id']},
+            {**valid, 'score': 11},
+            {**valid, 'title': 0, 'author': 'nobody'},
+            valid,
+        ]
+        response = admin_client.post(self.URL, data=payload, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        errors = response.json()
+        assert errors[0] == {}
+        assert set(errors[1]) == {'non_field_errors'}, (
+            'Проверьте, что уже существующий отзыв автора на произведение '
+            'не принимается.'
+        )
+        assert set(errors[2]) == {'score'}
+        assert set(errors[3]) == {'title', 'author'}
+        assert set(errors[4]) == {'non_field_errors'}, (
+            'Проверьте, что пакет не может содержать два отзыва автора '
+            'на одно произведение.'
+        )
+        assert Review.objects.count() == len(reviews)
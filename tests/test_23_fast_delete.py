@@ -0,0 +1,121 @@
+import re
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def create_title_with_reviews(users, count, prefix='reader'):
+    from django.contrib.auth import get_user_model
+    from reviews.models import Comment, Review, Title
+    from reviews.utils import bulk_create_reviews, bulk_insert
+
+    authors = bulk_insert(get_user_model(), [
+        get_user_model()(
+            username=f'{prefix}{idx}', email=f'{prefix}{idx}@yamdb.fake')
+        for idx in range(count - len(users))
+    ])
+    authors = [*users, *authors][:count]
+    title = Title.objects.create(name='Популярное', year=2000)
+    other = Title.objects.create(name='Другое', year=2001)
+    reviews = bulk_create_reviews([
+        Review(title=title, author=author, text=f'Отзыв {idx}',
+               score=idx % 10 + 1)
+        for idx, author in enumerate(authors)
+    ])
+    Comment.objects.bulk_create(
+        Comment(review=review, author=users[0], text='Комментарий')
+        for review in reviews
+    )
+    return title, other
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23FastDelete:
+
+    def test_01_title_delete_without_loading_reviews(self, admin_client,
+                                                     admin, user):
+        from reviews.models import Comment, Review
+
+        title, _ = create_title_with_reviews([admin, user], 50)
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.delete(f'/api/v1/titles/{title.id}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert not Review.objects.filter(title_id=title.id).exists()
+        assert not Comment.objects.exists()
+        deletes = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith((
+                'DELETE FROM "reviews_review"',
+                'DELETE FROM "reviews_comment"'))
+        ]
+        assert not any(
+            re.search(r'"id" IN \(\d', sql) for sql in deletes), (
+            'Проверьте, что при удалении произведения отзывы и '
+            'комментарии удаляются запросами по условию, без загрузки '
+            'строк в память.'
+        )
+
+    def test_02_query_count_does_not_grow(self, admin_client, admin, user):
+        # Первый запрос загружает администратора в кеш аутентификации.
+        admin_client.get('/api/v1/users/me/')
+        counts = []
+        for count in (2, 40):
+            title, _ = create_title_with_reviews(
+                [admin, user], count, prefix=f'reader{count}-')
+            with CaptureQueriesContext(connection) as context:
+                admin_client.delete(f'/api/v1/titles/{title.id}/')
+            counts.append(len(context.captured_queries))
+        assert counts[0] == counts[1], (
+            'Проверьте, что число запросов при удалении произведения не '
+            'зависит от числа его отзывов.'
+        )
+
+    def test_03_user_delete_keeps_ratings(self, admin_client, admin,
+                                          django_user_model):
+        from reviews.models import Comment, Review
+
+        users = [
+            django_user_model.objects.create(
+                username=f'critic{idx}', email=f'critic{idx}@yamdb.fake')
+            for idx in range(2)
+        ]
+        title, other = create_title_with_reviews(users, 2)
+        Review.objects.create(title=other, author=users[0], text='Ещё',
+                              score=10)
+        Review.objects.create(title=other, author=users[1], text='Ещё',
+                              score=4)
+        url = f'/api/v1/users/{users[0].username}/'
+        response = admin_client.delete(url)
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert not Review.objects.filter(author=users[0]).exists()
+        assert not Comment.objects.exists(), (
+            'Проверьте, что удаляются и комментарии к отзывам пользователя.'
+        )
+        for item in (title, other):
+            item.refresh_from_db()
+            scores = list(
+                Review.objects.filter(title=item).values_list(
+                    'score', flat=True))
+            assert item.review_count == len(scores)
+            assert item.score_sum == sum(scores)
+            assert item.rating == sum(scores) // len(scores), (
+                'Проверьте, что рейтинг произведений пересчитывается после '
+                'удаления отзывов пользователя.'
+            )
+        response = admin_client.get(f'/api/v1/titles/{other.id}/')
+        assert response.json()['rating'] == 4
+
+    def test_04_review_delete_removes_comments(self, admin_client, admin,
+                                               user):
+        from reviews.models import Comment, Review
+
+        title, _ = create_title_with_reviews([admin, user], 2)
+        review = Review.objects.filter(title=title).first()
+        response = admin_client.delete(
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert not Comment.objects.filter(review_id=review.id).exists()
+        title.refresh_from_db()
+        assert title.review_count == 1
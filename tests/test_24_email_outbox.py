@@ -0,0 +1,116 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+
+
+class CountingBackend(EmailBackend):
+    opened = 0
+
+    def open(self):
+        type(self).opened += 1
+        return super().open()
+
+
+class FailingBackend(BaseEmailBackend):
+
+    def send_messages(self, messages):
+        raise ConnectionError('почтовый сервер недоступен')
+
+
+@pytest.fixture
+def queued_outbox(settings):
+    settings.EMAIL_OUTBOX = {**settings.EMAIL_OUTBOX, 'EAGER': False}
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24EmailOutbox:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+
+    def test_01_signup_only_enqueues(self, client, queued_outbox, settings):
+        from users.models import OutboxEmail
+
+        settings.EMAIL_BACKEND = (
+            'tests.test_24_email_outbox.CountingBackend')
+        CountingBackend.opened = 0
+        for idx in range(3):
+            response = client.post(self.URL_SIGNUP, data={
+                'email': f'reader{idx}@yamdb.fake',
+                'username': f'reader{idx}',
+            })
+            assert response.status_code == HTTPStatus.OK
+        assert not mail.outbox, (
+            'Проверьте, что регистрация только ставит письмо в очередь '
+            'и не отправляет его во время запроса.'
+        )
+        assert OutboxEmail.objects.count() == 3
+
+        call_command('send_queued_emails')
+        assert sorted(message.to[0] for message in mail.outbox) == [
+            f'reader{idx}@yamdb.fake' for idx in range(3)
+        ]
+        assert CountingBackend.opened == 1, (
+            'Проверьте, что пачка писем отправляется через одно соединение.'
+        )
+        assert not OutboxEmail.objects.exists(), (
+            'Проверьте, что отправленные письма удаляются из очереди.'
+        )
+
+    def test_02_retry_with_backoff(self, queued_outbox, settings):
+        from users.models import OutboxEmail
+        from users.outbox import deliver_outbox, enqueue_email
+
+        settings.EMAIL_OUTBOX = {
+            **settings.EMAIL_OUTBOX, 'MAX_ATTEMPTS': 3, 'RETRY_DELAY': 10}
+        settings.EMAIL_BACKEND = 'tests.test_24_email_outbox.FailingBackend'
+        email = enqueue_email('Тема', 'Текст', 'reader@yamdb.fake')
+
+        assert deliver_outbox() == (0, 1)
+        email.refresh_from_db()
+        assert email.attempts == 1
+        assert 'почтовый сервер недоступен' in email.last_error
+        delay = email.next_attempt - timezone.now()
+        assert timedelta(seconds=8) < delay <= timedelta(seconds=10)
+        assert deliver_outbox() == (0, 0), (
+            'Проверьте, что письмо не отправляется повторно до истечения '
+            'задержки.'
+        )
+
+        OutboxEmail.objects.update(next_attempt=timezone.now())
+        deliver_outbox()
+        email.refresh_from_db()
+        delay = email.next_attempt - timezone.now()
+        assert timedelta(seconds=18) < delay <= timedelta(seconds=20), (
+            'Проверьте, что задержка между попытками растёт.'
+        )
+
+        OutboxEmail.objects.update(next_attempt=timezone.now())
+        deliver_outbox()
+        email.refresh_from_db()
+        assert email.attempts == 3
+        assert email.next_attempt is None, (
+            'Проверьте, что письмо перестаёт отправляться после '
+            'MAX_ATTEMPTS попыток.'
+        )
+
+        settings.EMAIL_BACKEND = (
+            'django.core.mail.backends.locmem.EmailBackend')
+        assert deliver_outbox() == (0, 0)
+        assert not mail.outbox
+
+    def test_03_eager_delivery_after_commit(self, settings):
+        from django.db import transaction
+        from users.outbox import enqueue_email
+
+        with transaction.atomic():
+            enqueue_email('Тема', 'Текст', 'reader@yamdb.fake')
+            assert not mail.outbox
+        assert [message.to for message in mail.outbox] == [
+            ['reader@yamdb.fake']
+        ]
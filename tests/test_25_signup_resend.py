@@ -0,0 +1,62 @@
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25SignupResend:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+    DATA = {'username': 'reader', 'email': 'reader@yamdb.fake'}
+
+    def test_01_repeated_signup_sends_one_email(
+            self, client, django_assert_num_queries):
+        for _ in range(3):
+            response = client.post(self.URL_SIGNUP, data=self.DATA)
+            assert response.status_code == HTTPStatus.OK
+        assert len(mail.outbox) == 1, (
+            'Проверьте, что повторные регистрации той же пары имени и '
+            'почты в окне повторной отправки не высылают новых писем.'
+        )
+        with django_assert_num_queries(0):
+            response = client.post(self.URL_SIGNUP, data=self.DATA)
+        assert response.status_code == HTTPStatus.OK
+
+    def test_02_existing_user_code_is_coalesced(
+            self, client, admin_client, django_user_model):
+        from django.contrib.auth.tokens import default_token_generator
+
+        admin_client.post('/api/v1/users/', data=self.DATA)
+        for _ in range(2):
+            client.post(self.URL_SIGNUP, data=self.DATA)
+        assert len(mail.outbox) == 1
+        code = mail.outbox[0].body.split()[-1]
+        user = django_user_model.objects.get(username='reader')
+        assert default_token_generator.check_token(user, code)
+        response = client.post('/api/v1/auth/token/', data={
+            'username': 'reader', 'confirmation_code': code})
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что код из первого письма остаётся действительным.'
+        )
+
+    def test_03_window_expires(self, client, settings):
+        settings.SIGNUP_RESEND_WINDOW = 0
+        for _ in range(2):
+            client.post(self.URL_SIGNUP, data=self.DATA)
+        assert len(mail.outbox) == 2, (
+            'Проверьте, что после окна повторной отправки код высылается '
+            'снова.'
+        )
+
+    def test_04_deleted_user_signs_up_again(self, client, admin_client,
+                                            django_user_model):
+        client.post(self.URL_SIGNUP, data=self.DATA)
+        admin_client.delete('/api/v1/users/reader/')
+        response = client.post(self.URL_SIGNUP, data=self.DATA)
+        assert response.status_code == HTTPStatus.OK
+        assert django_user_model.objects.filter(username='reader').exists(), (
+            'Проверьте, что после удаления пользователя регистрация с теми '
+            'же данными снова создаёт его.'
+        )
+        assert len(mail.outbox) == 2
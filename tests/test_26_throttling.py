@@ -0,0 +1,132 @@
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.fixture
+def rates(settings):
+    def set_rates(**scopes):
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            'DEFAULT_THROTTLE_RATES': {
+                **settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'],
+                **scopes,
+            },
+        }
+    return set_rates
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26Throttling:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+
+    def test_01_signup_throttled_without_queries(
+            self, client, rates, django_assert_num_queries):
+        rates(signup='3/min')
+        for idx in range(3):
+            response = client.post(self.URL_SIGNUP, data={
+                'username': f'reader{idx}', 'email': f'reader{idx}@yamdb.fake'
+            })
+            assert response.status_code == HTTPStatus.OK
+        with django_assert_num_queries(0):
+            response = client.post(self.URL_SIGNUP, data={
+                'username': 'reader9', 'email': 'reader9@yamdb.fake'
+            })
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что регистрация ограничена по частоте, а проверка '
+            'ограничения не обращается к БД.'
+        )
+        assert int(response['Retry-After']) > 0
+        response = client.post(
+            self.URL_SIGNUP, data={
+                'username': 'reader9', 'email': 'reader9@yamdb.fake'
+            }, REMOTE_ADDR='10.0.0.2')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что анонимные клиенты ограничиваются по IP.'
+        )
+
+    def test_02_review_writes_throttled_per_user(
+            self, client, admin_client, user_client, rates):
+        from reviews.models import Title
+
+        rates(reviews='2/min')
+        titles = [
+            Title.objects.create(name=f'Фильм {idx}', year=2000)
+            for idx in range(3)
+        ]
+        statuses = [
+            user_client.post(
+                f'/api/v1/titles/{title.id}/reviews/',
+                data={'text': 'Отзыв', 'score': 5}).status_code
+            for title in titles
+        ]
+        assert statuses == [
+            HTTPStatus.CREATED, HTTPStatus.CREATED,
+            HTTPStatus.TOO_MANY_REQUESTS
+        ], 'Проверьте, что создание отзывов ограничено по частоте.'
+        response = admin_client.post(
+            f'/api/v1/titles/{titles[2].id}/reviews/',
+            data={'text': 'Отзыв', 'score': 5})
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что ограничение считается для каждого пользователя.'
+        )
+        response = user_client.get(f'/api/v1/titles/{titles[0].id}/reviews/')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что чтение отзывов не ограничивается частотой записи.'
+        )
+
+    def test_03_sliding_window(self, rates, monkeypatch):
+        from rest_framework.test import APIRequestFactory
+        from rest_framework.views import APIView
+
+        from api.throttling import CacheRateThrottle, WriteRateThrottle
+
+        class View(APIView):
+            throttle_scope = 'signup'
+
+        rates(signup='10/min')
+        now = [600.0]
+        monkeypatch.setattr(CacheRateThrottle, 'timer', lambda self: now[0])
+        request = APIRequestFactory().post('/')
+        request.user = None
+
+        def allowed(count):
+            return sum(
+                WriteRateThrottle().allow_request(request, View())
+                for _ in range(count)
+            )
+
+        assert allowed(12) == 10
+        # Половина следующей минуты: из 12 запросов прошлой минуты
+        # учитывается 6, так что проходит ещё 4.
+        now[0] = 690.0
+        throttle = WriteRateThrottle()
+        assert allowed(4) == 4
+        assert not throttle.allow_request(request, View())
+        assert 0 < throttle.wait() <= 60
+
+    def test_04_counters_are_atomic(self, rates, monkeypatch):
+        from rest_framework.test import APIRequestFactory
+        from rest_framework.views import APIView
+
+        from api.throttling import CacheRateThrottle, WriteRateThrottle
+
+        class View(APIView):
+            throttle_scope = 'signup'
+
+        rates(signup='50/hour')
+        monkeypatch.setattr(CacheRateThrottle, 'timer', lambda self: 7200.0)
+        request = APIRequestFactory().post('/')
+        request.user = None
+
+        def attempt(_):
+            return WriteRateThrottle().allow_request(request, View())
+
+        with ThreadPoolExecutor(8) as executor:
+            results = list(executor.map(attempt, range(200)))
+        assert sum(results) == 50, (
+            'Проверьте, что параллельные запросы не теряют отметки '
+            'друг друга.'
+        )
@@ -0,0 +1,148 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+
+def user_queries(context):
+    return [
+        query for query in context.captured_queries
+        if 'FROM "users_myuser"' in query['sql']
+    ]
+
+
+def client_with_token(token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+@pytest.fixture(autouse=True)
+def shared_cache(settings):
+    # Тесты идут в одном процессе, локальный кеш для них общий.
+    settings.AUTH_CACHE_SHARED = True
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27JWTAuth:
+
+    def get_token(self, client, user):
+        from django.contrib.auth.tokens import default_token_generator
+
+        response = client.post('/api/v1/auth/token/', data={
+            'username': user.username,
+            'confirmation_code': default_token_generator.make_token(user),
+        })
+        assert response.status_code == HTTPStatus.OK
+        return response.json()['token']
+
+    def test_01_token_claims_without_user_query(self, client, user):
+        from api.authentication import user_cache
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        token = self.get_token(client, user)
+        claims = AccessToken(token)
+        assert claims['role'] == user.role
+        assert claims['username'] == user.username
+        user_cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = client_with_token(token).get('/api/v1/titles/')
+        assert response.status_code == HTTPStatus.OK
+        assert not user_queries(context), (
+            'Проверьте, что пользователь из токена с claims роли не '
+            'читается из БД.'
+        )
+
+    def test_02_role_change_applies(self, client, admin_client, user):
+        token = self.get_token(client, user)
+        user_client = client_with_token(token)
+        assert user_client.get(
+            '/api/v1/users/').status_code == HTTPStatus.FORBIDDEN
+        admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'admin'})
+        assert user_client.get('/api/v1/users/').status_code == HTTPStatus.OK, (
+            'Проверьте, что смена роли пользователя действует сразу, '
+            'несмотря на роль в claims токена.'
+        )
+        with CaptureQueriesContext(connection) as context:
+            user_client.get('/api/v1/titles/')
+        assert not user_queries(context), (
+            'Проверьте, что после смены роли пользователь снова берётся '
+            'из кеша.'
+        )
+        admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'user'})
+        assert user_client.get(
+            '/api/v1/users/').status_code == HTTPStatus.FORBIDDEN
+
+    def test_03_deleted_user_rejected(self, client, admin_client, user):
+        token = self.get_token(client, user)
+        user_client = client_with_token(token)
+        assert user_client.get('/api/v1/users/me/').status_code == (
+            HTTPStatus.OK)
+        admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert user_client.get('/api/v1/users/me/').status_code == (
+            HTTPStatus.UNAUTHORIZED), (
+            'Проверьте, что токен удалённого пользователя перестаёт '
+            'действовать.'
+        )
+
+    def test_04_reviews_by_cached_user(self, user_client, user):
+        from reviews.models import Review, Title
+
+        title = Title.objects.create(name='Фильм', year=2000)
+        user_client.get('/api/v1/titles/')
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, data={'text': 'Отзыв',
+                                                   'score': 5})
+        assert response.status_code == HTTPStatus.CREATED
+        assert response.json()['author'] == user.username
+        assert not user_queries(context)
+        review = Review.objects.get()
+        assert review.author_id == user.id
+        response = user_client.patch(
+            f'{url}{review.id}/', data={'text': 'Новый текст'})
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что автор может редактировать свой отзыв.'
+        )
+
+    def test_05_lru_is_bounded(self):
+        from api.authentication import AuthUserCache
+
+        lru = AuthUserCache(2)
+        lru.put(1, 'a', {'id': 1})
+        lru.put(2, 'a', {'id': 2})
+        lru.get(1, 'a')
+        lru.put(3, 'a', {'id': 3})
+        assert lru.get(2, 'a') is None
+        assert lru.get(1, 'a') == {'id': 1}
+        assert lru.get(1, 'b') is None
+
+    def test_06_process_local_cache_reads_user(self, client, admin_client,
+                                               user, settings):
+        from django.contrib.auth import get_user_model
+
+        from api.authentication import auth_cache_shared
+
+        settings.AUTH_CACHE_SHARED = None
+        assert not auth_cache_shared(), (
+            'Проверьте, что LocMemCache не считается общим кешем '
+            'процессов.'
+        )
+        token = self.get_token(client, user)
+        user_client = client_with_token(token)
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.get('/api/v1/titles/')
+        assert response.status_code == HTTPStatus.OK
+        assert len(user_queries(context)) == 1, (
+            'Проверьте, что без общего кеша пользователь читается из БД '
+            'на каждый запрос, а не берётся из claims токена.'
+        )
+        # Сброс в другом процессе сюда бы не дошёл: роль из БД видна
+        # сразу и без сброса кеша.
+        get_user_model().objects.filter(pk=user.pk).update(role='admin')
+        assert user_client.get('/api/v1/users/').status_code == (
+            HTTPStatus.OK)
@@ -0,0 +1,70 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28TokenCache:
+
+    def test_01_repeated_token_not_decoded(self, user_client, monkeypatch):
+        from rest_framework_simplejwt.backends import TokenBackend
+
+        from api.authentication import token_cache
+
+        token_cache.clear()
+        decode = TokenBackend.decode
+        calls = []
+
+        def counting_decode(self, *args, **kwargs):
+            calls.append(1)
+            return decode(self, *args, **kwargs)
+
+        monkeypatch.setattr(TokenBackend, 'decode', counting_decode)
+        for _ in range(3):
+            response = user_client.get('/api/v1/users/me/')
+            assert response.status_code == HTTPStatus.OK
+        assert len(calls) == 1, (
+            'Проверьте, что подпись одного и того же токена проверяется '
+            'один раз.'
+        )
+
+    def test_02_invalid_token_not_cached(self, client):
+        from api.authentication import token_cache
+
+        token_cache.clear()
+        for _ in range(2):
+            response = client.get(
+                '/api/v1/users/me/', HTTP_AUTHORIZATION='Bearer broken')
+            assert response.status_code == HTTPStatus.UNAUTHORIZED
+        assert not token_cache._entries
+
+    def test_03_entries_expire(self, monkeypatch):
+        from api.authentication import VerifiedTokenCache
+
+        now = [1000.0]
+        monkeypatch.setattr(
+            VerifiedTokenCache, 'timer', lambda self: now[0])
+        cache = VerifiedTokenCache(maxsize=2, ttl=60)
+        cache.put(b'short', {'exp': 1010})
+        cache.put(b'long', {'exp': 5000})
+        cache.put(b'expired', {'exp': 999})
+        assert cache.get(b'expired') is None
+        now[0] = 1020.0
+        assert cache.get(b'short') is None, (
+            'Проверьте, что запись не переживает срок действия токена.'
+        )
+        assert cache.get(b'long') == {'exp': 5000}
+        now[0] = 1061.0
+        assert cache.get(b'long') is None, (
+            'Проверьте, что запись живёт не дольше VERIFIED_TOKEN_TTL.'
+        )
+
+    def test_04_bounded(self):
+        from api.authentication import VerifiedTokenCache
+
+        cache = VerifiedTokenCache(maxsize=2, ttl=60)
+        exp = {'exp': cache.timer() + 600}
+        for raw_token in (b'a', b'b', b'c'):
+            cache.put(raw_token, exp)
+        assert cache.get(b'a') is None
+        assert cache.get(b'c') == exp
@@ -305,3 +305,21 @@ def check_fields(obj_type, url_pattern, obj, expected_data, detail=False):
         f'данные {obj_types[obj_type]}{results_in_msg}. Поле `id` не '
         'найдено или не является целым числом.'
     )
+
+
+def check_query_budget(response, url):
+    endpoint = response.get('X-Query-Endpoint')
+    assert endpoint, (
+        f'Проверьте, что ответ на запрос к `{url}` содержит заголовок '
+        '`X-Query-Endpoint`: включите QueryBudgetMiddleware.'
+    )
+    budget = response.get('X-Query-Budget')
+    assert budget is not None, (
+        f'Проверьте, что для `{endpoint}` объявлен бюджет SQL-запросов '
+        'в атрибуте `query_budget` вьюкласса.'
+    )
+    count = int(response['X-Query-Count'])
+    assert count <= int(budget), (
+        f'Запрос к `{url}` ({endpoint}) выполнил {count} SQL-запросов при '
+        f'бюджете {budget}.'
+    )